@@ -0,0 +1,83 @@
+"""
+Cost of recording interaction events.
+
+Compares the request-path cost of EventBuffer.record against writing each
+event with its own INSERT + COMMIT, and measures how fast the background
+flush drains the buffer into SQLite.
+
+Run from the server directory:
+    python -m benchmarks.bench_event_ingestion [n_events]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel
+
+from src.api.lib.event_buffer import EventBuffer
+from src.api.models import Event
+from src.api.schemas import EventType
+from src.api.utils import now_utc
+from src.core.database import create_engine
+
+PER_EVENT_SAMPLE = 500
+
+
+async def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    user_id = uuid4()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(url=f"sqlite+aiosqlite:///{os.path.join(tmp, 'e.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async_session = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        # One INSERT + COMMIT per event, as a request handler would do it
+        started = time.perf_counter()
+        for i in range(PER_EVENT_SAMPLE):
+            async with async_session() as db:
+                await db.execute(
+                    insert(Event),
+                    [
+                        {
+                            "type": EventType.DETAIL_VIEW,
+                            "movie_id": i,
+                            "user_id": user_id,
+                            "created_at": now_utc(),
+                        }
+                    ],
+                )
+                await db.commit()
+        per_event = (time.perf_counter() - started) / PER_EVENT_SAMPLE
+        print(f">> insert+commit per event: {per_event * 1e6:10.1f} us")
+
+        buffer = EventBuffer(max_size=n, batch_size=5_000, retry_after=1)
+        started = time.perf_counter()
+        for i in range(n):
+            buffer.record(EventType.DETAIL_VIEW, i, user_id)
+        per_record = (time.perf_counter() - started) / n
+        print(f">> EventBuffer.record:       {per_record * 1e6:10.1f} us")
+
+        started = time.perf_counter()
+        await buffer.flush(async_session)
+        elapsed = time.perf_counter() - started
+        print(f">> flush {n} events:     {elapsed:10.2f} s ({n / elapsed:,.0f}/s)")
+
+        async with async_session() as db:
+            stored = await db.scalar(select(func.count()).select_from(Event))
+        print(f">> stored {stored} rows, stats {buffer.stats()}")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""
+Concurrent rating writes through MovieService.rate_movie.
+
+Many users rate (and re-rate) a handful of hot movies from concurrent
+sessions, then each movie's avg_rating/total_rating_users is compared with
+AVG/COUNT over its user_rating rows. Any difference is a lost update.
+
+Run from the server directory:
+    python -m benchmarks.bench_rating_writes [writers] [ratings_per_writer]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel
+
+from src.api.models import Movie, User, UserRating, Year
+from src.api.services import MovieService
+from src.core.database import create_engine
+from src.core.movie_card import refresh_movie_cards
+from src.core.rating_aggregates import create_rating_triggers
+
+HOT_MOVIES = 5
+
+
+async def seed(session: AsyncSession, writers: int) -> list[User]:
+    year_id = uuid4()
+    await session.execute(insert(Year), [{"id": year_id, "year": 2000}])
+    await session.execute(
+        insert(Movie),
+        [
+            {
+                "id": movie_id,
+                "original_title": f"Movie {movie_id}",
+                "overview": "Synthetic overview.",
+                "original_language": "en",
+                "poster_path": f"/{movie_id}.jpg",
+                "avg_rating": 0.0,
+                "total_rating_users": 0,
+                "popularity_score": 0.0,
+                "tmdb_id": movie_id,
+                "year_id": year_id,
+                "release_year": 2000,
+            }
+            for movie_id in range(1, HOT_MOVIES + 1)
+        ],
+    )
+    users = [User(name=f"bench {i}") for i in range(writers)]
+    session.add_all(users)
+    await refresh_movie_cards(session)
+    await session.commit()
+    return users
+
+
+async def writer(
+    async_session: async_sessionmaker[AsyncSession], user: User, ratings: int
+) -> None:
+    rng = random.Random(str(user.id))
+    for _ in range(ratings):
+        async with async_session() as session:
+            await MovieService(session).rate_movie(
+                rng.randint(1, HOT_MOVIES), user.id, rng.randint(1, 5)
+            )
+
+
+async def main() -> None:
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    ratings = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(url=f"sqlite+aiosqlite:///{tmp}/ratings.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await create_rating_triggers(conn, split=False)
+        async_session = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        async with async_session() as session:
+            users = await seed(session, writers)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(writer(async_session, user, ratings) for user in users))
+        elapsed = time.perf_counter() - started
+        total = writers * ratings
+        print(
+            f">> {total} ratings from {writers} writers in {elapsed:.2f}s "
+            f"({total / elapsed:.0f}/s)"
+        )
+
+        async with async_session() as session:
+            expected = await session.execute(
+                select(
+                    UserRating.movie_id,
+                    func.avg(UserRating.rating),
+                    func.count(),
+                ).group_by(UserRating.movie_id)
+            )
+            movies = await session.execute(
+                select(Movie.id, Movie.avg_rating, Movie.total_rating_users)
+            )
+            actual = {row[0]: row[1:] for row in movies}
+
+        lost = 0
+        for movie_id, avg, count in expected:
+            got_avg, got_count = actual[movie_id]
+            ok = got_count == count and abs(got_avg - avg) < 1e-6
+            lost += not ok
+            print(
+                f"   movie {movie_id}: expected {avg:.4f} over {count}, "
+                f"stored {got_avg:.4f} over {got_count} {'ok' if ok else 'MISMATCH'}"
+            )
+        print(">> aggregates consistent" if not lost else f">> {lost} movies drifted")
+
+        await engine.dispose()
+        sys.exit(1 if lost else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""
+Memory and time of the ratings aggregation in data_seed.py.
+
+Writes a synthetic, userId-sorted ratings.csv, then aggregates it with the
+in-memory groupby and with the chunked NumPy mode, each in a fresh
+subprocess so their peak RSS can be compared. The two results must match.
+
+Run from the server directory:
+    python -m benchmarks.bench_ratings_aggregation [n_ratings] [chunk_size]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+PREPROCESSING = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "src", "data", "preprocessing"
+)
+N_MOVIES = 60_000
+N_USERS = 160_000
+
+RUN = """
+import sys, time
+sys.path.insert(0, {preprocessing!r})
+import pandas as pd
+from data_seed import RATING_DTYPES, aggregate_ratings_chunked, compute_rating_stats
+
+started = time.perf_counter()
+if {chunk_size}:
+    stats = aggregate_ratings_chunked({path!r}, {n_movies}, {chunk_size})
+else:
+    stats = compute_rating_stats(pd.read_csv({path!r}, dtype=RATING_DTYPES))
+elapsed = time.perf_counter() - started
+stats.to_pickle({out!r})
+# VmHWM, unlike ru_maxrss, does not carry over the parent's peak across exec
+with open("/proc/self/status") as f:
+    peak_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM"))
+peak_mb = peak_kb / 1024
+print(f"{{elapsed:.2f}} {{peak_mb:.0f}}")
+"""
+
+
+def write_ratings(path: str, n: int) -> None:
+    rng = np.random.default_rng(0)
+    users = np.sort(rng.integers(1, N_USERS, n, dtype=np.int32))
+    # Zipf-ish popularity so a few movies get most ratings
+    movies = (rng.pareto(1.2, n) * 50).astype(np.int64) % N_MOVIES + 1
+    df = pd.DataFrame(
+        {
+            "userId": users,
+            "movieId": movies,
+            "rating": rng.integers(1, 11, n) / 2,
+            "timestamp": rng.integers(8e8, 1.7e9, n),
+        }
+    )
+    # A user rates a movie once, as in MovieLens
+    df.drop_duplicates(["userId", "movieId"]).to_csv(path, index=False)
+
+
+def run(path: str, out: str, chunk_size: int) -> tuple[float, float]:
+    code = RUN.format(
+        preprocessing=PREPROCESSING,
+        path=path,
+        out=out,
+        n_movies=N_MOVIES + 1,
+        chunk_size=chunk_size,
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    elapsed, peak_mb = result.stdout.split()
+    return float(elapsed), float(peak_mb)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "ratings.csv")
+        write_ratings(path, n)
+        size_mb = os.path.getsize(path) / 2**20
+        print(f">> ratings.csv: {size_mb:.0f} MB")
+
+        in_memory, chunked = (
+            os.path.join(workdir, "in_memory.pkl"),
+            os.path.join(workdir, "chunked.pkl"),
+        )
+        for label, out, size in (
+            ("in-memory", in_memory, 0),
+            (f"chunked {chunk_size}", chunked, chunk_size),
+        ):
+            elapsed, peak_mb = run(path, out, size)
+            print(f">> {label:<18} {elapsed:>7.2f}s  peak RSS {peak_mb:>6.0f} MB")
+
+        expected = pd.read_pickle(in_memory)
+        actual = pd.read_pickle(chunked)
+        pd.testing.assert_frame_equal(
+            expected.reset_index(drop=True), actual, check_dtype=False
+        )
+        print(">> results match")
+
+
+if __name__ == "__main__":
+    main()
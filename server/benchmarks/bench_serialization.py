@@ -0,0 +1,66 @@
+"""
+Microbenchmark for list endpoint serialization.
+
+Compares FastAPI's default response_model path (re-validate, jsonable_encoder,
+json.dumps) against JSONBytesResponse for a 100-item movie list.
+
+Run from the server directory: python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import json
+import timeit
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+import src.api.schemas as schema
+from src.api.lib import JSONBytesResponse
+
+ITEMS = 100
+ROUNDS = 2000
+
+
+def build_movies() -> list[schema.MovieTrending]:
+    return [
+        schema.MovieTrending(
+            id=i,
+            original_title=f"Movie {i}",
+            overview="A fairly typical TMDB overview sentence. " * 8,
+            poster_path=f"https://image.tmdb.org/t/p/w500/{i}.jpg",
+            avg_rating=3.5,
+            genres=["Action", "Adventure", "Sci-Fi"],
+            year=2018,
+        )
+        for i in range(ITEMS)
+    ]
+
+
+def main() -> None:
+    movies = build_movies()
+    field = create_model_field(
+        name="response", type_=list[schema.MovieTrending], mode="serialization"
+    )
+    loop = asyncio.new_event_loop()
+
+    def before() -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=movies)
+        )
+        return JSONResponse(content).body
+
+    def after() -> bytes:
+        return JSONBytesResponse(movies, list[schema.MovieTrending]).body
+
+    assert json.loads(before()) == json.loads(after())
+
+    for name, fn in (("response_model", before), ("JSONBytesResponse", after)):
+        seconds = timeit.timeit(fn, number=ROUNDS)
+        print(f"{name:>18}: {seconds / ROUNDS * 1e6:8.1f} us per {ITEMS}-item list")
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Throughput benchmark for the TMDB enrichment pipeline in data_seed.py.
+
+Starts a local stub of the TMDB movie endpoint with fixed latency and random
+429/500 responses, then enriches N ids through TMDBClient twice: once cold
+and once against the warm response cache. A third, one-request-at-a-time run
+approximates the old sequential loop (without its fixed 0.25s sleep).
+
+Run from the server directory:
+    python -m benchmarks.bench_tmdb_enrichment [n_ids] [latency_ms]
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "src", "data", "preprocessing")
+)
+
+from data_seed import enrich_movies  # noqa: E402
+from tmdb_client import TMDBClient  # noqa: E402
+
+ERROR_RATE = 0.05
+MISSING_EVERY = 50  # every Nth id is unknown to the stub and returns 404
+
+
+def make_handler(latency: float):
+    class StubTMDB(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            time.sleep(latency)
+            tmdb_id = int(self.path.split("?")[0].rsplit("/", 1)[-1])
+
+            roll = random.random()
+            if roll < ERROR_RATE / 2:
+                self._send(429, {}, {"Retry-After": "0.2"})
+            elif roll < ERROR_RATE:
+                self._send(500, {})
+            elif tmdb_id % MISSING_EVERY == 0:
+                self._send(404, {"status_code": 34})
+            else:
+                self._send(
+                    200,
+                    {
+                        "title": f"Movie {tmdb_id}",
+                        "overview": "A fairly typical TMDB overview.",
+                        "original_language": "en",
+                        "poster_path": f"/{tmdb_id}.jpg",
+                        "credits": {
+                            "cast": [{"name": f"Actor {i}"} for i in range(8)],
+                            "crew": [{"name": "Director", "job": "Director"}],
+                        },
+                    },
+                )
+
+        def _send(self, status: int, body: dict, headers: dict | None = None) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return StubTMDB
+
+
+async def run(
+    label: str, ids: list[int], base_url: str, workdir: str, **client_kwargs
+) -> None:
+    client = TMDBClient(
+        api_key="bench",
+        base_url=base_url,
+        cache_path=os.path.join(workdir, f"{label.split()[0]}.sqlite"),
+        **client_kwargs,
+    )
+    checkpoint = os.path.join(workdir, f"{label.replace(' ', '_')}.csv")
+
+    started = time.perf_counter()
+    df = await enrich_movies(ids, client, checkpoint)
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    print(
+        f">> {label:<18} {len(df):>6} rows {elapsed:>7.2f}s "
+        f"{len(ids) / elapsed:>8.1f} ids/s  {client.stats}"
+    )
+
+
+async def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    ids = list(range(1, n + 1))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        await run("pipeline cold", ids, base_url, workdir, rate=200, concurrency=16)
+        # Same cache, fresh checkpoint: every id is served from the cache
+        await run("pipeline warm", ids, base_url, workdir, rate=200, concurrency=16)
+        # Capped at 200 ids, it is only there as the baseline
+        await run(
+            "sequential",
+            ids[:200],
+            base_url,
+            workdir,
+            rate=200,
+            concurrency=1,
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,11 +1,21 @@
+import asyncio
 from fastapi import FastAPI, status
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from src.api import api_router
-from src.core import init_db, create_fts_table, engine
-from sqlalchemy.ext.asyncio import (
-    AsyncSession,
-    async_sessionmaker,
+from src.api.lib import (
+    run_session_cache_sync,
+    run_movie_detail_cache_sync,
+    run_trending_sync,
+    run_event_flusher,
+)
+from src.core import (
+    init_db,
+    create_fts_table,
+    async_session,
+    catalog_split,
+    run_session_pruning,
+    QueryStatsMiddleware,
 )
 
 
@@ -15,14 +25,29 @@ async def life_span(app: FastAPI):
     await init_db()
 
     # Create FTS table once DB is ready
-    async_session = async_sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
-    async with async_session() as session:
-        await create_fts_table(session)
+    if not catalog_split:
+        # A split catalog ships with its FTS table already built
+        async with async_session() as session:
+            await create_fts_table(session)
+
+    # Keep this worker's session cache in sync with logouts on other workers
+    sync_task = asyncio.create_task(run_session_cache_sync(async_session))
+    # ...and its movie detail cache in sync with ratings written elsewhere
+    detail_sync_task = asyncio.create_task(run_movie_detail_cache_sync(async_session))
+    prune_task = asyncio.create_task(run_session_pruning(async_session))
+    # Trending scores are fed from ratings written by every worker
+    trending_task = asyncio.create_task(run_trending_sync(async_session))
+    event_task = asyncio.create_task(run_event_flusher(async_session))
 
     yield
     print("Application is shutting down...")
+    sync_task.cancel()
+    prune_task.cancel()
+    detail_sync_task.cancel()
+    trending_task.cancel()
+    event_task.cancel()
+    # Let the trending loop write its final snapshot and buffered events drain
+    await asyncio.gather(trending_task, event_task, return_exceptions=True)
 
 
 app = FastAPI(title="FilmFlare", description="FilmFlare API", lifespan=life_span)
@@ -30,6 +55,8 @@ app = FastAPI(title="FilmFlare", description="FilmFlare API", lifespan=life_span
 
 app.include_router(api_router)
 
+app.add_middleware(QueryStatsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -1,4 +1,10 @@
-from .routes import auth_router, user_router, movie_router
+from .routes import (
+    auth_router,
+    user_router,
+    movie_router,
+    metrics_router,
+    event_router,
+)
 
 from fastapi import APIRouter
 
@@ -6,3 +12,5 @@ api_router = APIRouter()
 api_router.include_router(auth_router, prefix="/auth", tags=["Auth"])
 api_router.include_router(user_router, prefix="/users", tags=["Users"])
 api_router.include_router(movie_router, prefix="/movies", tags=["Movies"])
+api_router.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
+api_router.include_router(event_router, prefix="/events", tags=["Events"])
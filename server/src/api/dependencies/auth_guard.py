@@ -7,6 +7,7 @@ from uuid import UUID
 from src.core import get_session
 from src.api.models import User, Session
 from src.api.schemas import AuthGuard
+from src.api.lib import session_cache
 from src.api.security.access_token_bearer import AccessTokenBearer
 
 
@@ -21,6 +22,10 @@ async def auth_guard(
     user_id = token_data.user_id
     session_id = token_data.session_id
 
+    # Recently validated pairs skip the database entirely
+    if session_cache.contains(user_id, session_id):
+        return AuthGuard(user_id=user_id, session_id=session_id)
+
     # Validate user
     user = await db.scalar(
         select(User).where(User.id == user_id, User.is_active == True)
@@ -30,11 +35,12 @@ async def auth_guard(
 
     # Validate session
     session = await db.scalar(
-        select(Session).where(
+        select(Session.id).where(
             Session.id == session_id, Session.user_id == user_id, Session.valid == True
         )
     )
     if not session:
         raise HTTPException(status_code=401, detail="Invalid or expired session")
 
+    session_cache.add(user_id, session_id)
     return AuthGuard(user_id=user_id, session_id=session_id)
@@ -1,2 +1,8 @@
 from .jwt_service import JWTService
 from .password_service import PasswordService
+from .json_response import JSONBytesResponse, encode_json
+from .session_cache import session_cache, run_session_cache_sync
+from .hashing_pool import hashing_pool
+from .movie_detail_cache import movie_detail_cache, run_movie_detail_cache_sync
+from .trending import trending_scores, run_trending_sync
+from .event_buffer import event_buffer, run_event_flusher
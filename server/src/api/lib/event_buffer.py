@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Iterable
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import Config
+from src.api.models import Event
+from src.api.schemas import EventIn, EventType
+from src.api.utils import now_utc
+
+logger = logging.getLogger("event_buffer")
+
+
+class EventBuffer:
+    """
+    Bounded in-process queue of interaction events, flushed in batches.
+
+    Recording an event appends one row to a deque and never touches the
+    database. A background task (`run_event_flusher`) writes the rows to the
+    append-only `event` table in large multi-row inserts. When the buffer is
+    full, new events are dropped and counted rather than blocking requests.
+    """
+
+    def __init__(self, max_size: int, batch_size: int, retry_after: int) -> None:
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.retry_after = retry_after
+        self._rows: deque[dict[str, Any]] = deque()
+        self._batch_ready = asyncio.Event()
+
+        self.accepted = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+        self.batches = 0
+        self.flush_time_total = 0.0
+        self.flush_time_max = 0.0
+
+    def record(
+        self,
+        type: EventType,
+        movie_id: int,
+        user_id: UUID | None = None,
+        source_movie_id: int | None = None,
+    ) -> bool:
+        """Queue one event; False if the buffer was full and it was dropped."""
+        if len(self._rows) >= self.max_size:
+            self.dropped += 1
+            return False
+
+        self._rows.append(
+            {
+                "type": type,
+                "movie_id": movie_id,
+                "source_movie_id": source_movie_id,
+                "user_id": user_id,
+                "created_at": now_utc(),
+            }
+        )
+        self.accepted += 1
+        if len(self._rows) >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    def record_batch(self, events: Iterable[EventIn], user_id: UUID) -> int:
+        """Queue all of `events` or, with 503 and Retry-After, none of them."""
+        events = list(events)
+        if len(self._rows) + len(events) > self.max_size:
+            self.dropped += len(events)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Event buffer full, please retry",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        for event in events:
+            self.record(event.type, event.movie_id, user_id, event.source_movie_id)
+        return len(events)
+
+    async def wait(self, timeout: float) -> None:
+        """Sleep until a full batch is queued or `timeout` seconds pass."""
+        try:
+            await asyncio.wait_for(self._batch_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._batch_ready.clear()
+
+    async def flush(self, async_session: async_sessionmaker[AsyncSession]) -> None:
+        """Write out the events queued so far, `batch_size` rows per insert."""
+        pending = len(self._rows)
+        while pending > 0:
+            # Peek, and pop only once the batch is settled: a flush cancelled
+            # mid-insert (shutdown) leaves its rows for the final drain
+            count = min(pending, self.batch_size)
+            rows = list(islice(self._rows, count))
+            pending -= count
+
+            started_at = time.perf_counter()
+            try:
+                async with async_session() as db:
+                    await db.execute(insert(Event), rows)
+                    await db.commit()
+            except Exception as e:
+                # Dropped rather than re-queued, so one bad batch cannot wedge the buffer
+                self._discard(count)
+                self.failed += count
+                logger.exception("Failed to flush %d events: %s", count, e)
+                continue
+
+            self._discard(count)
+            elapsed = time.perf_counter() - started_at
+            self.flushed += len(rows)
+            self.batches += 1
+            self.flush_time_total += elapsed
+            self.flush_time_max = max(self.flush_time_max, elapsed)
+
+    def _discard(self, count: int) -> None:
+        # record() only appends on the right, so the oldest rows are the batch
+        for _ in range(count):
+            self._rows.popleft()
+
+    def stats(self) -> dict[str, Any]:
+        batches = self.batches or 1
+        return {
+            "max_size": self.max_size,
+            "batch_size": self.batch_size,
+            "pending": len(self._rows),
+            "accepted": self.accepted,
+            "dropped": self.dropped,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "batches": self.batches,
+            "flush_ms_avg": round(self.flush_time_total / batches * 1000, 3),
+            "flush_ms_max": round(self.flush_time_max * 1000, 3),
+        }
+
+
+event_buffer = EventBuffer(
+    max_size=Config.EVENT_BUFFER_MAX_SIZE,
+    batch_size=Config.EVENT_FLUSH_BATCH_SIZE,
+    retry_after=Config.EVENT_RETRY_AFTER_SECONDS,
+)
+
+
+async def run_event_flusher(async_session: async_sessionmaker[AsyncSession]) -> None:
+    """Background loop writing buffered events every interval or full batch."""
+    try:
+        while True:
+            await event_buffer.wait(Config.EVENT_FLUSH_INTERVAL_MS / 1000)
+            await event_buffer.flush(async_session)
+    finally:
+        # Drain what is left on shutdown
+        await event_buffer.flush(async_session)
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+from fastapi import HTTPException, status
+
+from src.config import Config
+
+T = TypeVar("T")
+
+
+class HashingPool:
+    """
+    Size-limited executor for CPU-heavy password hashing.
+
+    bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+    loop. Once `max_pending` jobs are queued or running, new jobs are rejected
+    with 503 and Retry-After instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hashing"
+        )
+        self._pending = 0
+
+        self.completed = 0
+        self.rejected = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        submitted_at = time.perf_counter()
+        timings: list[float] = []
+
+        def timed() -> T:
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings.extend((started_at, time.perf_counter()))
+
+        self._pending += 1
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(timed)
+
+        # Released when the hash finishes, not when the caller stops waiting:
+        # a cancelled request leaves bcrypt running in its thread
+        def done(_future: Future) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._release, submitted_at, timings)
+
+        future.add_done_callback(done)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, submitted_at: float, timings: list[float]) -> None:
+        self._pending -= 1
+        if timings:
+            self._record(timings[0] - submitted_at, timings[1] - timings[0])
+
+    def _record(self, queue_time: float, hash_time: float) -> None:
+        self.completed += 1
+        self.queue_time_total += queue_time
+        self.queue_time_max = max(self.queue_time_max, queue_time)
+        self.hash_time_total += hash_time
+        self.hash_time_max = max(self.hash_time_max, hash_time)
+
+    def stats(self) -> dict[str, Any]:
+        completed = self.completed or 1
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_ms_avg": round(self.queue_time_total / completed * 1000, 3),
+            "queue_ms_max": round(self.queue_time_max * 1000, 3),
+            "hash_ms_avg": round(self.hash_time_total / completed * 1000, 3),
+            "hash_ms_max": round(self.hash_time_max * 1000, 3),
+        }
+
+
+hashing_pool = HashingPool(
+    workers=Config.HASH_POOL_WORKERS,
+    max_pending=Config.HASH_POOL_MAX_PENDING,
+    retry_after=Config.HASH_POOL_RETRY_AFTER_SECONDS,
+)
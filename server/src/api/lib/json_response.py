@@ -0,0 +1,39 @@
+from functools import lru_cache
+from typing import Any
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def encode_json(data: Any, schema: Any) -> bytes:
+    """Serialize already-validated data to JSON bytes using the schema's serializer."""
+    return _adapter(schema).dump_json(data)
+
+
+class JSONBytesResponse(Response):
+    """
+    JSON response that serializes once, straight to bytes.
+
+    Routes returning this response skip FastAPI's response_model re-validation
+    and jsonable_encoder pass. Content may be pre-encoded bytes (e.g. from a cache)
+    or schema objects together with the schema type describing them.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, schema: Any = None, **kwargs: Any) -> None:
+        self.schema = schema
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if self.schema is None:
+            raise TypeError(
+                "JSONBytesResponse needs a schema to encode non-bytes content"
+            )
+        return encode_json(content, self.schema)
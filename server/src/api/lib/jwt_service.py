@@ -1,3 +1,5 @@
+import hashlib
+import hmac
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from src.config import Config
@@ -11,12 +13,16 @@ class JWTService:
     """Handle JWT token generation and verification"""
 
     ALGORITHM = "HS256"
+    REFRESH_HASH_PREFIX = "hmac-sha256$"
 
     def __init__(self) -> None:
         self.access_secret: str = Config.JWT_SECRET
         self.refresh_secret: str = Config.JWT_REFRESH_SECRET
         self.access_expire_minutes: int = Config.ACCESS_EXPIRE_MINUTES
         self.refresh_expire_days: int = Config.REFRESH_EXPIRE_DAYS
+        self.refresh_hash_secret: bytes = (
+            Config.REFRESH_HASH_SECRET or Config.JWT_REFRESH_SECRET
+        ).encode("utf-8")
 
     def _create_payload(self, user_id: UUID, session_id: UUID, expire_delta: timedelta):
         now: datetime = now_utc()
@@ -79,3 +85,21 @@ class JWTService:
             access_data["user_id"] == refresh_data["user_id"]
             and access_data["session_id"] == refresh_data["session_id"]
         )
+
+    def hash_refresh_token(self, token: str) -> str:
+        """Keyed HMAC-SHA256 of a refresh token for storage.
+
+        Refresh tokens are high-entropy JWTs, so a slow KDF adds nothing.
+        """
+        digest = hmac.new(
+            self.refresh_hash_secret, token.encode("utf-8"), hashlib.sha256
+        ).hexdigest()
+        return f"{self.REFRESH_HASH_PREFIX}{digest}"
+
+    def is_refresh_hash(self, stored_hash: str) -> bool:
+        """True for HMAC hashes, False for legacy bcrypt hashes."""
+        return stored_hash.startswith(self.REFRESH_HASH_PREFIX)
+
+    def verify_refresh_token(self, token: str, stored_hash: str) -> bool:
+        """Constant-time comparison against a stored HMAC hash."""
+        return hmac.compare_digest(self.hash_refresh_token(token), stored_hash)
@@ -0,0 +1,90 @@
+import asyncio
+import time
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import select, col
+
+from src.config import Config
+from src.api.models import Movie
+from src.api.utils import now_utc
+import src.api.schemas as MovieSchema
+
+logger = logging.getLogger("movie_detail_cache")
+
+
+class MovieDetailCache:
+    """
+    In-process cache of the catalog part of MovieDetail, keyed by movie id.
+
+    Entries are stored with `user_rating=None`; callers fill in the per-user
+    rating. A rating written on this worker evicts directly; ratings written
+    on other workers are picked up by `sync`, which polls movies whose
+    `updated_at` moved since the previous poll.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[int, tuple[MovieSchema.MovieDetail, float]] = {}
+        self._synced_at: datetime = now_utc()
+
+    def get(self, movie_id: int) -> MovieSchema.MovieDetail | None:
+        entry = self._entries.get(movie_id)
+        if entry is None:
+            return None
+
+        detail, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(movie_id, None)
+            return None
+        return detail
+
+    def add(self, detail: MovieSchema.MovieDetail) -> None:
+        if self.ttl <= 0:
+            return
+        if len(self._entries) >= self.max_entries:
+            # Dicts keep insertion order, so this drops the oldest entry
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[detail.id] = (detail, time.monotonic() + self.ttl)
+
+    def evict(self, movie_id: int) -> None:
+        self._entries.pop(movie_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def sync(self, db: AsyncSession) -> None:
+        """Evict movies changed by any worker since the last poll."""
+        # Overlap the window slightly so rows committed during the previous
+        # poll are not missed.
+        since = self._synced_at - timedelta(seconds=1)
+        self._synced_at = now_utc()
+
+        if not self._entries:
+            return
+
+        movies = await db.execute(
+            select(Movie.id).where(col(Movie.updated_at) >= since)
+        )
+        for movie_id in movies.scalars():
+            self.evict(movie_id)
+
+
+movie_detail_cache = MovieDetailCache(
+    ttl=Config.MOVIE_DETAIL_CACHE_TTL_SECONDS,
+    max_entries=Config.MOVIE_DETAIL_CACHE_MAX_ENTRIES,
+)
+
+
+async def run_movie_detail_cache_sync(
+    async_session: async_sessionmaker[AsyncSession],
+) -> None:
+    """Background loop that drops details whose ratings changed on other workers."""
+    while True:
+        await asyncio.sleep(Config.MOVIE_DETAIL_CACHE_SYNC_SECONDS)
+        try:
+            async with async_session() as db:
+                await movie_detail_cache.sync(db)
+        except Exception as e:
+            logger.exception("Movie detail cache sync failed: %s", e)
@@ -1,6 +1,7 @@
 import bcrypt
 from uuid import UUID
 from src.config import Config
+from .hashing_pool import hashing_pool
 
 
 class PasswordService:
@@ -19,3 +20,13 @@ class PasswordService:
             password=password[:72].encode("utf-8"),
             hashed_password=hashed.encode("utf-8"),
         )
+
+    @staticmethod
+    async def hashed_async(password: str) -> str:
+        """Hash on the bounded hashing pool so the event loop stays free."""
+        return await hashing_pool.run(PasswordService.hashed, password)
+
+    @staticmethod
+    async def compareHash_async(password: str, hashed: str) -> bool:
+        """Verify on the bounded hashing pool so the event loop stays free."""
+        return await hashing_pool.run(PasswordService.compareHash, password, hashed)
@@ -0,0 +1,105 @@
+import asyncio
+import time
+import logging
+from datetime import datetime, timedelta
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import select, col
+
+from src.config import Config
+from src.api.models import Session, User
+from src.api.utils import now_utc
+
+logger = logging.getLogger("session_cache")
+
+
+class SessionCache:
+    """
+    In-process cache of validated (user_id, session_id) pairs.
+
+    Entries live at most `ttl` seconds, which is capped by the access-token
+    lifetime. Local writes (logout, refresh rotation) evict directly; other
+    workers pick up invalidations through `sync`, which polls sessions and
+    deactivated users changed since the previous poll.
+    """
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[UUID, tuple[UUID, float]] = {}
+        self._synced_at: datetime = now_utc()
+
+    def contains(self, user_id: UUID, session_id: UUID) -> bool:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return False
+
+        cached_user_id, expires_at = entry
+        if cached_user_id != user_id or expires_at <= time.monotonic():
+            self._entries.pop(session_id, None)
+            return False
+        return True
+
+    def add(self, user_id: UUID, session_id: UUID) -> None:
+        if self.ttl <= 0:
+            return
+        if len(self._entries) >= self.max_entries:
+            # Dicts keep insertion order, so this drops the oldest entry
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[session_id] = (user_id, time.monotonic() + self.ttl)
+
+    def evict_session(self, session_id: UUID) -> None:
+        self._entries.pop(session_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def sync(self, db: AsyncSession) -> None:
+        """Evict sessions and users invalidated by any worker since the last poll."""
+        # Overlap the window slightly so rows committed during the previous
+        # poll are not missed.
+        since = self._synced_at - timedelta(seconds=1)
+        self._synced_at = now_utc()
+
+        if not self._entries:
+            return
+
+        sessions = await db.execute(
+            select(Session.id).where(
+                Session.valid == False, col(Session.updated_at) >= since
+            )
+        )
+        for session_id in sessions.scalars():
+            self.evict_session(session_id)
+
+        users = await db.execute(
+            select(User.id).where(
+                User.is_active == False, col(User.updated_at) >= since
+            )
+        )
+        deactivated = set(users.scalars())
+        if deactivated:
+            self._entries = {
+                session_id: entry
+                for session_id, entry in self._entries.items()
+                if entry[0] not in deactivated
+            }
+
+
+session_cache = SessionCache(
+    ttl=min(Config.SESSION_CACHE_TTL_SECONDS, Config.ACCESS_EXPIRE_MINUTES * 60),
+    max_entries=Config.SESSION_CACHE_MAX_ENTRIES,
+)
+
+
+async def run_session_cache_sync(
+    async_session: async_sessionmaker[AsyncSession],
+) -> None:
+    """Background loop that keeps this worker's cache in line with the others."""
+    while True:
+        await asyncio.sleep(Config.SESSION_CACHE_SYNC_SECONDS)
+        try:
+            async with async_session() as db:
+                await session_cache.sync(db)
+        except Exception as e:
+            logger.exception("Session cache sync failed: %s", e)
@@ -0,0 +1,210 @@
+import asyncio
+import fcntl
+import heapq
+import logging
+import math
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import IO, Iterable
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import select, col
+
+from src.config import Config
+from src.api.models import UserRating
+
+logger = logging.getLogger("trending")
+
+# Movies whose decayed score fell below this no longer count as trending
+MIN_SCORE = 0.01
+
+
+def _epoch(at: datetime) -> float:
+    # SQLite hands back naive datetimes; everything stored is UTC
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return at.timestamp()
+
+
+class TrendingScores:
+    """
+    Exponentially time-decayed activity score per movie.
+
+    Scores live in a NumPy array indexed by movie id and are all expressed as
+    of one instant, so decaying them is a single multiply. Decay scales every
+    score alike, which means only movies that received activity can change
+    rank: the top-k is kept by re-selecting from the previous top-k plus the
+    touched movies instead of sorting everything.
+
+    Fed by `sync`, which polls user_rating for writes from every worker, and
+    by `add` for other activity such as views.
+    """
+
+    def __init__(self, half_life_hours: float, top_k: int) -> None:
+        self.tau = half_life_hours * 3600 / math.log(2)
+        self.top_k = top_k
+        self._scores = np.zeros(0, dtype=np.float64)
+        self._as_of = time.time()
+        self._top: list[int] = []
+        # Poll cursor, plus the rows already counted in the overlap window
+        self._synced_at: datetime | None = None
+        self._seen: set[tuple[int, str, float]] = set()
+
+    def _decay_to(self, now: float) -> None:
+        if now > self._as_of:
+            self._scores *= math.exp((self._as_of - now) / self.tau)
+            self._as_of = now
+
+    def add(self, events: Iterable[tuple[int, datetime, float]]) -> None:
+        """Record `(movie_id, at, weight)` events."""
+        events = list(events)
+        if not events:
+            return
+
+        movie_ids = np.fromiter((e[0] for e in events), dtype=np.int64)
+        at = np.fromiter((_epoch(e[1]) for e in events), dtype=np.float64)
+        weights = np.fromiter((e[2] for e in events), dtype=np.float64)
+
+        self._decay_to(time.time())
+        size = int(movie_ids.max()) + 1
+        if size > len(self._scores):
+            grow = max(size, 2 * len(self._scores)) - len(self._scores)
+            self._scores = np.pad(self._scores, (0, grow))
+
+        # Events stamped ahead of our clock count at full weight
+        decay = np.exp(np.minimum(at - self._as_of, 0) / self.tau)
+        np.add.at(self._scores, movie_ids, weights * decay)
+
+        candidates = set(self._top)
+        candidates.update(movie_ids.tolist())
+        self._top = heapq.nlargest(self.top_k, candidates, key=self._scores.__getitem__)
+
+    def top(self, n: int) -> list[int]:
+        """Ids of the `n` hottest movies, hottest first."""
+        self._decay_to(time.time())
+        return [
+            movie_id
+            for movie_id in self._top[:n]
+            if self._scores[movie_id] >= MIN_SCORE
+        ]
+
+    async def sync(self, db: AsyncSession) -> None:
+        """Count ratings written by any worker since the last poll."""
+        now = datetime.now(timezone.utc)
+        if self._synced_at is None:
+            # Nothing restored: replay the window that still carries weight
+            self._synced_at = now - timedelta(seconds=8 * self.tau)
+        # Overlap the window slightly so rows committed during the previous
+        # poll are not missed; `_seen` stops them being counted twice.
+        since = self._synced_at - timedelta(seconds=1)
+        self._synced_at = now
+
+        rows = await db.execute(
+            select(UserRating.movie_id, UserRating.user_id, UserRating.updated_at)
+            .where(col(UserRating.updated_at) >= since)
+            .where(col(UserRating.is_pseudo).is_(False))
+        )
+        seen, events = set(), []
+        for movie_id, user_id, updated_at in rows:
+            key = (movie_id, str(user_id), _epoch(updated_at))
+            seen.add(key)
+            if key not in self._seen:
+                events.append((movie_id, updated_at, 1.0))
+        self._seen = seen
+        self.add(events)
+
+    def save(self, path: str) -> None:
+        """Atomically write the scores, poll cursor and overlap set to `path`."""
+        seen = sorted(self._seen)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                scores=self._scores,
+                as_of=self._as_of,
+                synced_at=_epoch(self._synced_at) if self._synced_at else np.nan,
+                seen_movie_ids=np.array([key[0] for key in seen], dtype=np.int64),
+                seen_user_ids=np.array([key[1] for key in seen], dtype="U36"),
+                seen_at=np.array([key[2] for key in seen], dtype=np.float64),
+            )
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> bool:
+        """Restore a snapshot; `sync` then resumes from where it was taken."""
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as snapshot:
+            self._scores = snapshot["scores"]
+            self._as_of = float(snapshot["as_of"])
+            synced_at = float(snapshot["synced_at"])
+            # Rows in the next poll's overlap window were counted before the save
+            self._seen = set(
+                zip(
+                    snapshot["seen_movie_ids"].tolist(),
+                    snapshot["seen_user_ids"].tolist(),
+                    snapshot["seen_at"].tolist(),
+                )
+            )
+        if not math.isnan(synced_at):
+            self._synced_at = datetime.fromtimestamp(synced_at, timezone.utc)
+
+        k = min(self.top_k, len(self._scores))
+        top = np.argpartition(-self._scores, k - 1)[:k] if k else []
+        self._top = sorted(
+            (int(i) for i in top), key=self._scores.__getitem__, reverse=True
+        )
+        return True
+
+
+trending_scores = TrendingScores(
+    half_life_hours=Config.TRENDING_HALF_LIFE_HOURS,
+    top_k=Config.TRENDING_TOP_K,
+)
+
+
+def _claim_snapshot(path: str) -> IO | None:
+    """
+    Lock `path`.lock without waiting; only the worker holding it writes the
+    snapshot. The lock goes with the process, so another worker takes over.
+    """
+    lock = open(f"{path}.lock", "a")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return None
+    return lock
+
+
+async def run_trending_sync(async_session: async_sessionmaker[AsyncSession]) -> None:
+    """Background loop feeding trending_scores and snapshotting it periodically."""
+    path = Config.TRENDING_SNAPSHOT_PATH
+    try:
+        trending_scores.load(path)
+    except Exception as e:
+        logger.exception("Could not restore trending snapshot: %s", e)
+
+    # Every worker keeps its own scores, but they all poll the same table, so
+    # one snapshot written by one of them serves every restart
+    lock = _claim_snapshot(path)
+    saved_at = time.monotonic()
+    try:
+        while True:
+            try:
+                async with async_session() as db:
+                    await trending_scores.sync(db)
+                if time.monotonic() - saved_at >= Config.TRENDING_SNAPSHOT_SECONDS:
+                    lock = lock or _claim_snapshot(path)
+                    if lock:
+                        trending_scores.save(path)
+                    saved_at = time.monotonic()
+            except Exception as e:
+                logger.exception("Trending sync failed: %s", e)
+            await asyncio.sleep(Config.TRENDING_SYNC_SECONDS)
+    finally:
+        # Also on shutdown, so a restart loses nothing
+        if lock:
+            trending_scores.save(path)
+            lock.close()
@@ -13,5 +13,9 @@ from .model import (
     UserAuth,
     Year,
     MovieData,
+    MovieCard,
     UserRating,
+    RatingDelta,
+    RatingWatermark,
+    Event,
 )
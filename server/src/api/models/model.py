@@ -1,10 +1,10 @@
-from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint
+from sqlmodel import SQLModel, Field, Relationship, UniqueConstraint, Index
 from pydantic import EmailStr
 from uuid import UUID, uuid4
 from datetime import datetime
 from typing import Optional
 from src.api.utils import now_utc
-from src.api.schemas import AuthProvider
+from src.api.schemas import AuthProvider, EventType
 
 
 class User(SQLModel, table=True):
@@ -16,7 +16,8 @@ class User(SQLModel, table=True):
     is_active: bool = Field(default=True)
     email_verified: bool = Field(default=False)
     created_at: datetime = Field(default_factory=now_utc)
-    updated_at: datetime = Field(default_factory=now_utc)
+    # Indexed for the session cache's poll of recently deactivated users
+    updated_at: datetime = Field(default_factory=now_utc, index=True)
 
     auth: Optional["UserAuth"] = Relationship(
         back_populates="user", sa_relationship_kwargs={"uselist": False}
@@ -46,6 +47,13 @@ class UserAuth(SQLModel, table=True):
 
 class Session(SQLModel, table=True):
     __tablename__: str = "session"
+    __table_args__: tuple[Index, ...] = (
+        # Covers the auth_guard lookup so it never touches the table rows.
+        # Declared unique (id already is) so SQLite prefers it over the PK index.
+        Index("ix_session_id_user_id_valid", "id", "user_id", "valid", unique=True),
+        # Lets pruning find expired sessions without a full table scan
+        Index("ix_session_updated_at", "updated_at"),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True, index=True)
     user_id: UUID = Field(foreign_key="user.id", index=True)
@@ -78,6 +86,10 @@ class MovieData(SQLModel, table=True):
 
 class MovieGenreLink(SQLModel, table=True):
     __tablename__: str = "movie_genre_link"
+    __table_args__: tuple[Index] = (
+        # Genre-filtered listings start from the genre side of the link
+        Index("ix_movie_genre_link_genre_id_movie_id", "genre_id", "movie_id"),
+    )
 
     movie_id: int = Field(foreign_key="movie.id", primary_key=True)
     genre_id: UUID = Field(foreign_key="genre.id", primary_key=True)
@@ -144,6 +156,23 @@ class Year(SQLModel, table=True):
 
 class Movie(SQLModel, table=True):
     __tablename__: str = "movie"
+    __table_args__: tuple[Index, ...] = (
+        # top_rating / search: ORDER BY release_year DESC, avg_rating DESC, ...
+        Index(
+            "ix_movie_release_year_rating",
+            "release_year",
+            "avg_rating",
+            "total_rating_users",
+        ),
+        # top_trending: ORDER BY popularity_score DESC, avg_rating DESC LIMIT n,
+        # with release_year in the index so the year filter needs no row lookup
+        Index(
+            "ix_movie_popularity_rating_year",
+            "popularity_score",
+            "avg_rating",
+            "release_year",
+        ),
+    )
 
     id: int = Field(primary_key=True, index=True)
     original_title: str = Field(index=True)
@@ -152,12 +181,17 @@ class Movie(SQLModel, table=True):
     poster_path: str
     avg_rating: float
     total_rating_users: int
-    popularity_score: float = Field(index=True)
+    popularity_score: float
     tmdb_id: int = Field(index=True)
     year_id: UUID = Field(foreign_key="year.id", index=True)
+    # Denormalized from Year so hot queries never join it; Year stays for back-compat
+    release_year: Optional[int] = Field(default=None)
+    # Hash of the source row this movie was last written from (see seed.sync_catalog)
+    content_hash: Optional[str] = Field(default=None, repr=False)
 
     created_at: datetime = Field(default_factory=now_utc)
-    updated_at: datetime = Field(default_factory=now_utc)
+    # Indexed for the detail-cache poll of recently re-rated movies
+    updated_at: datetime = Field(default_factory=now_utc, index=True)
 
     genres: list[Genre] = Relationship(
         back_populates="movies", link_model=MovieGenreLink
@@ -172,6 +206,43 @@ class Movie(SQLModel, table=True):
     year: Year = Relationship(back_populates="movies")
 
 
+class MovieCard(SQLModel, table=True):
+    """
+    Read-only projection of Movie serving the list endpoints from one table.
+
+    Rebuilt from movie/genre by src.core.refresh_movie_cards, apart from the
+    rating columns the user_rating triggers keep current; never write it
+    directly.
+    """
+
+    __tablename__: str = "movie_card"
+    __table_args__: tuple[Index, ...] = (
+        Index(
+            "ix_movie_card_release_year_rating",
+            "release_year",
+            "avg_rating",
+            "total_rating_users",
+        ),
+        Index(
+            "ix_movie_card_popularity_rating_year",
+            "popularity_score",
+            "avg_rating",
+            "release_year",
+        ),
+    )
+
+    movie_id: int = Field(foreign_key="movie.id", primary_key=True)
+    original_title: str
+    overview: str
+    poster_path: str
+    avg_rating: float
+    total_rating_users: int
+    popularity_score: float
+    release_year: Optional[int] = Field(default=None)
+    # Genre names joined with "|", e.g. "Action|Drama"
+    genres: str = Field(default="")
+
+
 class UserRating(SQLModel, table=True):
     __tablename__: str = "user_rating"
     user_id: UUID = Field(foreign_key="user.id", primary_key=True)
@@ -180,12 +251,59 @@ class UserRating(SQLModel, table=True):
     is_pseudo: bool = Field(default=True)
 
     created_at: datetime = Field(default_factory=now_utc)
-    updated_at: datetime = Field(default_factory=now_utc)
+    # Indexed for the trending poll of recent ratings
+    updated_at: datetime = Field(default_factory=now_utc, index=True)
 
     user: User = Relationship(back_populates="ratings")
     movie: Movie = Relationship(back_populates="ratings")
 
 
+class RatingDelta(SQLModel, table=True):
+    """
+    Queue of rating aggregate changes waiting for a split catalog.
+
+    Filled by triggers on user_rating (see src.core.rating_aggregates) and
+    applied to movie in id order. AUTOINCREMENT keeps ids of pruned rows from
+    being handed out again.
+    """
+
+    __tablename__: str = "rating_delta"
+    __table_args__: dict[str, bool] = {"sqlite_autoincrement": True}
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    movie_id: int
+    rating_delta: int
+    users_delta: int
+    created_at: datetime = Field(default_factory=now_utc)
+
+
+class RatingWatermark(SQLModel, table=True):
+    """Single catalog row: the last rating_delta id folded into movie."""
+
+    __tablename__: str = "rating_watermark"
+
+    id: int = Field(default=1, primary_key=True)
+    last_delta_id: int = Field(default=0)
+
+
+class Event(SQLModel, table=True):
+    """
+    Append-only log of views and clicks, written in batches by the event buffer.
+
+    No foreign keys: inserts stay cheap and the table works with a split
+    catalog. Consumers read it in id order.
+    """
+
+    __tablename__: str = "event"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    type: EventType
+    movie_id: int
+    source_movie_id: Optional[int] = Field(default=None)
+    user_id: Optional[UUID] = Field(default=None)
+    created_at: datetime = Field(default_factory=now_utc, index=True)
+
+
 class UserPreference(SQLModel, table=True):
     __tablename__: str = "user_preference"
     __table_args__: tuple[UniqueConstraint] = (
@@ -1,3 +1,5 @@
 from .auth import auth_router
 from .user import user_router
 from .movies import movie_router
+from .metrics import metrics_router
+from .events import event_router
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, status, Depends
+from src.api.dependencies import auth_guard
+import src.api.schemas as schema
+from src.api.lib import event_buffer
+
+event_router = APIRouter()
+
+
+@event_router.post(
+    "",
+    response_model=schema.EventAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def ingest_events(
+    payload: schema.EventBatchIn,
+    auth_data: schema.AuthGuard = Depends(auth_guard),
+) -> schema.EventAccepted:
+    """Queue views and clicks; they are written to the database in batches."""
+    accepted = event_buffer.record_batch(payload.events, auth_data.user_id)
+    return schema.EventAccepted(accepted=accepted)
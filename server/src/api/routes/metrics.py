@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, status
+from src.api.dependencies import auth_guard
+from src.api.lib import hashing_pool, event_buffer
+from src.core import sql_metrics
+
+# Timings and buffer internals are not for anonymous clients
+metrics_router = APIRouter(dependencies=[Depends(auth_guard)])
+
+
+@metrics_router.get("/hashing", status_code=status.HTTP_200_OK)
+async def hashing_metrics() -> dict:
+    """Queue and hash timings for the password hashing pool."""
+    return hashing_pool.stats()
+
+
+@metrics_router.get("/events", status_code=status.HTTP_200_OK)
+async def event_metrics() -> dict:
+    """Buffer depth, drop counters and flush timings for event ingestion."""
+    return event_buffer.stats()
+
+
+@metrics_router.get("/sql", status_code=status.HTTP_200_OK)
+async def sql_stats() -> dict:
+    """Per-route statement counts, DB time and slow-query totals."""
+    return sql_metrics()
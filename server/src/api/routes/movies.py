@@ -1,74 +1,135 @@
-from fastapi import APIRouter, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from src.api.dependencies import auth_guard
 import src.api.schemas as schema
 from src.api.services import MovieService
-
+from src.api.lib import JSONBytesResponse, event_buffer
 
 movie_router = APIRouter()
 
 
 @movie_router.get(
-    "/search", response_model=list[schema.Movie], status_code=status.HTTP_200_OK
+    "/search",
+    response_model=list[schema.Movie],
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
 )
 async def search_movie(
     q: str = Query(..., description="Search query"),
     limit: int = Query(20, ge=1, le=100, description="Number of movies to fetch"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
     movie_service: MovieService = Depends(),
-) -> list[schema.Movie]:
-    return await movie_service.search(q, limit, offset)
+) -> JSONBytesResponse:
+    movies = await movie_service.search(q, limit, offset)
+    return JSONBytesResponse(movies, list[schema.Movie])
 
 
 @movie_router.get(
     "/trending",
     response_model=list[schema.MovieTrending],
+    response_class=JSONBytesResponse,
     status_code=status.HTTP_200_OK,
 )
 async def trending_movie(
     movie_service: MovieService = Depends(),
-) -> list[schema.MovieTrending] | None:
-    return await movie_service.top_trending()
+) -> JSONBytesResponse:
+    movies = await movie_service.top_trending()
+    return JSONBytesResponse(movies or [], list[schema.MovieTrending])
 
 
-@movie_router.get("/genres", response_model=list[str], status_code=status.HTTP_200_OK)
-async def genres(movie_service: MovieService = Depends()) -> list[str] | None:
-    return await movie_service.get_genres()
+@movie_router.get(
+    "/genres",
+    response_model=list[str],
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def genres(movie_service: MovieService = Depends()) -> JSONBytesResponse:
+    genres = await movie_service.get_genres()
+    return JSONBytesResponse(genres or [], list[str])
 
 
 @movie_router.get(
-    "/top_rated", response_model=list[schema.Movie], status_code=status.HTTP_200_OK
+    "/top_rated",
+    response_model=list[schema.Movie],
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
 )
 async def top_rated(
     q: str | None = Query(None, description="For Genres Based Rating"),
     limit: int = Query(10, ge=1, le=50, description="Number of movies to return"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
     movie_service: MovieService = Depends(),
-) -> list[schema.Movie] | None:
-    return await movie_service.top_rating(q=q, limit=limit, offset=offset)
+) -> JSONBytesResponse:
+    movies = await movie_service.top_rating(q=q, limit=limit, offset=offset)
+    return JSONBytesResponse(movies or [], list[schema.Movie])
+
+
+@movie_router.post(
+    "/bulk",
+    response_model=schema.MovieBulk,
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def bulk_movies(
+    payload: schema.MovieBulkIn,
+    movie_service: MovieService = Depends(),
+) -> JSONBytesResponse:
+    movies, missing = await movie_service.get_movies(payload.ids)
+    return JSONBytesResponse(
+        schema.MovieBulk(movies=movies, missing=missing), schema.MovieBulk
+    )
+
+
+@movie_router.post(
+    "/bulk/detail",
+    response_model=schema.MovieDetailBulk,
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def bulk_movies_detail(
+    payload: schema.MovieBulkIn,
+    auth_data: schema.AuthGuard = Depends(auth_guard),
+    movie_service: MovieService = Depends(),
+) -> JSONBytesResponse:
+    movies, missing = await movie_service.get_movies_detail(
+        payload.ids, auth_data.user_id
+    )
+    return JSONBytesResponse(
+        schema.MovieDetailBulk(movies=movies, missing=missing),
+        schema.MovieDetailBulk,
+    )
 
 
 @movie_router.get(
-    "/{movieId}", response_model=schema.MovieDetail, status_code=status.HTTP_200_OK
+    "/{movieId}",
+    response_model=schema.MovieDetail,
+    response_class=JSONBytesResponse,
+    status_code=status.HTTP_200_OK,
 )
 async def get_movie(
     movieId: int,
     auth_data: schema.AuthGuard = Depends(auth_guard),
     movie_service: MovieService = Depends(),
-) -> schema.MovieDetail | None:
-    return await movie_service.get_movie(movieId, auth_data.user_id)
+) -> JSONBytesResponse:
+    movie = await movie_service.get_movie(movieId, auth_data.user_id)
+    event_buffer.record(schema.EventType.DETAIL_VIEW, movieId, auth_data.user_id)
+    return JSONBytesResponse(movie, schema.MovieDetail)
 
 
 @movie_router.get(
     "/{movieId}/similar",
     response_model=list[schema.Movie],
+    response_class=JSONBytesResponse,
     status_code=status.HTTP_200_OK,
 )
 async def similar_movies(
     movieId: int,
     auth_data: schema.AuthGuard = Depends(auth_guard),
     movie_service: MovieService = Depends(),
-) -> list[schema.Movie] | None:
-    return await movie_service.get_similar_movies(movieId)
+) -> JSONBytesResponse:
+    movies = await movie_service.get_similar_movies(movieId)
+    if movies is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    return JSONBytesResponse(movies, list[schema.Movie])
 
 
 @movie_router.post("/admin/build-movie-data")
@@ -10,4 +10,13 @@ from .auth import (
     ClientMeta,
     payloadToken,
 )
-from .movie import Movie, MovieDetail, MovieRatingIn, MovieTrending
+from .movie import (
+    Movie,
+    MovieDetail,
+    MovieRatingIn,
+    MovieTrending,
+    MovieBulkIn,
+    MovieBulk,
+    MovieDetailBulk,
+)
+from .event import EventType, EventIn, EventBatchIn, EventAccepted
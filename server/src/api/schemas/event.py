@@ -0,0 +1,31 @@
+from enum import Enum
+from pydantic import BaseModel, Field
+
+
+class EventType(str, Enum):
+    DETAIL_VIEW = "detail_view"
+    SIMILAR_CLICK = "similar_click"
+    SEARCH_CLICK = "search_click"
+
+
+class EventIn(BaseModel):
+    """A user interaction with a movie.
+
+    Attributes:
+        type (EventType): What the user did.
+        movie_id (int): The movie viewed or clicked.
+        source_movie_id (int | None): For similar clicks, the movie whose
+            similar list was clicked.
+    """
+
+    type: EventType
+    movie_id: int
+    source_movie_id: int | None = None
+
+
+class EventBatchIn(BaseModel):
+    events: list[EventIn] = Field(min_length=1, max_length=100)
+
+
+class EventAccepted(BaseModel):
+    accepted: int
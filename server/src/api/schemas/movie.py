@@ -55,3 +55,23 @@ class MovieDetail(Movie):
 
 class MovieRatingIn(BaseModel):
     rating: int = Field(ge=1, le=5)
+
+
+class MovieBulkIn(BaseModel):
+    """Movie ids to look up in one request; duplicates are returned once."""
+
+    ids: list[int] = Field(min_length=1, max_length=500)
+
+
+class MovieBulk(BaseModel):
+    """Cards for the requested ids, in request order, plus ids that do not exist."""
+
+    movies: list[Movie]
+    missing: list[int]
+
+
+class MovieDetailBulk(BaseModel):
+    """Details for the requested ids, in request order, plus ids that do not exist."""
+
+    movies: list[MovieDetail]
+    missing: list[int]
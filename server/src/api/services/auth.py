@@ -3,11 +3,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from uuid import UUID
 from datetime import datetime, timezone
+from typing import cast
 
 from src.core import get_session
 from src.config import Config
-from src.api.lib import JWTService, PasswordService
+from src.api.lib import JWTService, PasswordService, session_cache
 from src.api.models import Session, User, UserAuth
+from src.api.utils import now_utc
 import src.api.schemas as AuthSchema
 import logging
 
@@ -46,7 +48,7 @@ class AuthService:
                 )
 
             # Create User and related UserAuth
-            hashed_password = self.password_service.hashed(data.password)
+            hashed_password = await self.password_service.hashed_async(data.password)
             user = User(name=data.name)
             self.session.add(user)
             await self.session.flush()  # Generate user.id
@@ -68,7 +70,9 @@ class AuthService:
             )
 
             # Save hashed refresh token in DB
-            session_obj.refresh_token_hash = self.password_service.hashed(refresh_token)
+            session_obj.refresh_token_hash = self.jwt_service.hash_refresh_token(
+                refresh_token
+            )
 
             # Commit DB changes
             await self.session.commit()
@@ -104,8 +108,11 @@ class AuthService:
                 raise HTTPException(status_code=401, detail="Invalid credentials")
 
             # Email/password validation
-            if not user_auth.password_hash or not self.password_service.compareHash(
-                data.password, user_auth.password_hash
+            if (
+                not user_auth.password_hash
+                or not await self.password_service.compareHash_async(
+                    data.password, user_auth.password_hash
+                )
             ):
                 raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -118,7 +125,9 @@ class AuthService:
             )
 
             # Store hashed refresh token
-            session_obj.refresh_token_hash = self.password_service.hashed(refresh_token)
+            session_obj.refresh_token_hash = self.jwt_service.hash_refresh_token(
+                refresh_token
+            )
             await self.session.commit()
 
             # Set refresh cookie
@@ -151,7 +160,9 @@ class AuthService:
                 )
 
             session_obj.valid = False
+            session_obj.updated_at = now_utc()
             await self.session.commit()
+            session_cache.evict_session(session_id)
 
             self._delete_cookie_token(response)
             logger.info(f"[LOGOUT] Session invalidated: {session_id}")
@@ -185,9 +196,7 @@ class AuthService:
                 raise HTTPException(status_code=401, detail="Invalid session")
 
             # Verify stored refresh hash
-            if not self.password_service.compareHash(
-                refresh_token, session_obj.refresh_token_hash
-            ):
+            if not await self._verify_refresh_hash(session_obj, refresh_token):
                 raise HTTPException(status_code=401, detail="Invalid refresh token")
 
             # Generate new access token
@@ -198,10 +207,12 @@ class AuthService:
                 new_refresh_token = self.jwt_service.generate_refresh_token(
                     user_id, session_id
                 )
-                session_obj.refresh_token = self.password_service.hashed(
+                session_obj.refresh_token_hash = self.jwt_service.hash_refresh_token(
                     new_refresh_token
                 )
+                session_obj.updated_at = now_utc()
                 self._set_cookie_token(response, new_refresh_token)
+                session_cache.evict_session(session_id)
                 logger.info(
                     f"[REFRESH] Rotated refresh token for session: {session_id}"
                 )
@@ -216,6 +227,28 @@ class AuthService:
             logger.exception("Token refresh failed: %s", e)
             raise HTTPException(status_code=500, detail="Token refresh failed")
 
+    async def _verify_refresh_hash(
+        self, session_obj: Session, refresh_token: str
+    ) -> bool:
+        """Check a refresh token against the session's stored hash.
+
+        Sessions created before HMAC storage still hold bcrypt hashes; those are
+        verified once with bcrypt and upgraded to HMAC in place.
+        """
+        stored_hash = cast(str, session_obj.refresh_token_hash)
+        if self.jwt_service.is_refresh_hash(stored_hash):
+            return self.jwt_service.verify_refresh_token(refresh_token, stored_hash)
+
+        if not await self.password_service.compareHash_async(
+            refresh_token, stored_hash
+        ):
+            return False
+
+        session_obj.refresh_token_hash = self.jwt_service.hash_refresh_token(
+            refresh_token
+        )
+        return True
+
     async def _create_session(
         self, user_id: UUID, data: AuthSchema.ClientMeta
     ) -> Session:
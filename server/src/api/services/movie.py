@@ -1,22 +1,26 @@
+import json
 from fastapi import Depends, HTTPException, Response, status
+from sqlalchemy import bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, or_, col, func, case, text
+from sqlmodel import select, or_, col, func, case, text, literal
 from sqlalchemy.orm import selectinload, InstrumentedAttribute
 from typing import cast
 from uuid import UUID
 
 from src.data.ml import similar
-from src.core import get_session
+from src.core import apply_rating_deltas, catalog_split, get_session
 from src.api.models import (
     Movie,
     Genre,
-    Year,
-    MovieGenreLink,
+    MovieCard,
     MovieData,
     UserRating,
 )
 import src.api.schemas as MovieSchema
 from src.api.utils import now_utc
+from src.config import Config
+from src.api.lib import movie_detail_cache, trending_scores
 
 
 class MovieService:
@@ -27,24 +31,25 @@ class MovieService:
         # Perform FTS search with ranking
         stmt = text(
             """
-            SELECT m.id, m.original_title, m.overview, m.poster_path, m.avg_rating
+            SELECT c.movie_id, c.original_title, c.overview, c.poster_path, c.avg_rating
             FROM movie_title_fts
-            JOIN movie m ON m.id = movie_title_fts.movie_id
-            JOIN year y ON y.id = m.year_id
+            JOIN movie_card c ON c.movie_id = movie_title_fts.movie_id
             WHERE movie_title_fts MATCH :query
-            ORDER BY y.year DESC, m.total_rating_users DESC
+            ORDER BY c.release_year DESC, c.total_rating_users DESC
             LIMIT :limit OFFSET :offset;
             """
         )
 
         result = await self.session.execute(
-            stmt, {"query": q, "limit": limit, "offset": offset}
+            stmt,
+            {"query": q, "limit": limit, "offset": offset},
+            bind_arguments={"mapper": MovieCard},  # raw SQL: route to the catalog
         )
         rows = result.fetchall()
 
         movies_out = [
             MovieSchema.Movie(
-                id=row.id,
+                id=row.movie_id,
                 original_title=row.original_title,
                 overview=row.overview,
                 poster_path=row.poster_path,
@@ -55,46 +60,48 @@ class MovieService:
 
         return movies_out
 
-    async def top_trending(self) -> list[MovieSchema.MovieTrending] | None:
-        stmt = (
-            select(Movie)
-            .options(
-                selectinload(cast(InstrumentedAttribute, Movie.genres)),
-                selectinload(cast(InstrumentedAttribute, Movie.actors)),
-                selectinload(cast(InstrumentedAttribute, Movie.directors)),
-                selectinload(cast(InstrumentedAttribute, Movie.year)),
+    async def top_trending(
+        self, limit: int = 8
+    ) -> list[MovieSchema.MovieTrending] | None:
+        # Live activity first, in score order
+        trending_ids = trending_scores.top(limit)
+        cards = []
+        if trending_ids:
+            result = await self.session.execute(
+                select(MovieCard).where(col(MovieCard.movie_id).in_(trending_ids))
             )
-            .join(Year, col(Movie.year_id) == col(Year.id))
-            .where(col(Year.year) > 2017)
-            .order_by(
-                col(Movie.popularity_score).desc(),
-                col(Movie.avg_rating).desc(),
-            )
-            .limit(8)
-        )
+            by_id = {c.movie_id: c for c in result.scalars()}
+            cards = [by_id[i] for i in trending_ids if i in by_id]
 
-        result = await self.session.execute(stmt)
-        movies = result.scalars().unique().all()
-
-        movies_out = []
-
-        for m in movies:
-            # Preload related data efficiently (already attached if relationships are configured)
-            genres = [g.genre for g in m.genres] if m.genres else []
-            actors = [a.name for a in m.actors] if m.actors else []
-            directors = [d.name for d in m.directors] if m.directors else []
-
-            movies_out.append(
-                MovieSchema.MovieTrending(
-                    id=m.id,
-                    original_title=m.original_title,
-                    overview=m.overview,
-                    poster_path=m.poster_path,
-                    avg_rating=m.avg_rating,
-                    genres=genres,
-                    year=m.year.year,
+        # Too little recent activity (e.g. a fresh install): fill up with the
+        # seeded popularity ranking of recent releases
+        if len(cards) < limit:
+            since_year = now_utc().year - Config.TRENDING_FALLBACK_YEARS
+            stmt = (
+                select(MovieCard)
+                .where(col(MovieCard.release_year) >= since_year)
+                .where(col(MovieCard.movie_id).not_in([c.movie_id for c in cards]))
+                .order_by(
+                    col(MovieCard.popularity_score).desc(),
+                    col(MovieCard.avg_rating).desc(),
                 )
+                .limit(limit - len(cards))
             )
+            result = await self.session.execute(stmt)
+            cards += result.scalars().all()
+
+        movies_out = [
+            MovieSchema.MovieTrending(
+                id=c.movie_id,
+                original_title=c.original_title,
+                overview=c.overview,
+                poster_path=c.poster_path,
+                avg_rating=c.avg_rating,
+                genres=c.genres.split("|") if c.genres else [],
+                year=c.release_year,
+            )
+            for c in cards
+        ]
 
         return movies_out if movies_out else None
 
@@ -111,14 +118,12 @@ class MovieService:
         self, q: str | None, limit: int = 10, offset: int = 0
     ) -> list[MovieSchema.Movie] | None:
         stmt = (
-            select(Movie)
-            .join(Year)
-            .options(selectinload(cast(InstrumentedAttribute, Movie.year)))
-            .where(col(Movie.total_rating_users) >= 30)
+            select(MovieCard)
+            .where(col(MovieCard.total_rating_users) >= 30)
             .order_by(
-                col(Year.year).desc(),
-                col(Movie.avg_rating).desc(),
-                col(Movie.total_rating_users).desc(),
+                col(MovieCard.release_year).desc(),
+                col(MovieCard.avg_rating).desc(),
+                col(MovieCard.total_rating_users).desc(),
             )
             .limit(limit)
             .offset(offset)
@@ -126,138 +131,153 @@ class MovieService:
 
         if q:
             genres = [g.strip() for g in q.replace("|", ",").split(",") if g.strip()]
-            stmt = (
-                stmt.join(MovieGenreLink)
-                .join(Genre)
-                .where(col(Genre.genre).in_(genres))
-                .where(col(Movie.total_rating_users) >= 30)
-                .order_by(
-                    col(Year.year).desc(),
-                    col(Movie.avg_rating).desc(),
-                    col(Movie.total_rating_users).desc(),
-                )
-                .limit(limit)
-                .offset(offset)
+            # Match whole names inside the packed "A|B|C" list, e.g. "|Drama|"
+            packed = literal("|") + col(MovieCard.genres) + "|"
+            stmt = stmt.where(
+                or_(*[packed.contains(f"|{g}|", autoescape=True) for g in genres])
             )
 
         result = await self.session.execute(stmt)
-        movies = result.scalars().unique().all()
+        cards = result.scalars().all()
 
-        movies_out = [
-            MovieSchema.Movie(
-                id=m.id,
-                original_title=m.original_title,
-                overview=m.overview,
-                poster_path=m.poster_path,
-                avg_rating=m.avg_rating,
-            )
-            for m in movies
-        ]
-
-        return movies_out
+        return [self._card_to_movie(c) for c in cards]
 
     async def get_movie(
         self, movieId: int, user_id: UUID | None = None
-    ) -> MovieSchema.MovieDetail | None:
-        stmt = (
-            select(Movie)
-            .where(Movie.id == movieId)
-            .options(
-                selectinload(cast(InstrumentedAttribute, Movie.genres)),
-                selectinload(cast(InstrumentedAttribute, Movie.actors)),
-                selectinload(cast(InstrumentedAttribute, Movie.directors)),
-                selectinload(cast(InstrumentedAttribute, Movie.year)),
+    ) -> MovieSchema.MovieDetail:
+        details, missing = await self.get_movies_detail([movieId], user_id)
+        if missing:
+            raise HTTPException(status_code=404, detail="Movie not found")
+        return details[0]
+
+    async def get_movies_detail(
+        self, movie_ids: list[int], user_id: UUID | None = None
+    ) -> tuple[list[MovieSchema.MovieDetail], list[int]]:
+        """Details for `movie_ids` in request order, plus the ids that do not exist."""
+        ids = list(dict.fromkeys(movie_ids))
+
+        found: dict[int, MovieSchema.MovieDetail] = {}
+        for movie_id in ids:
+            cached = movie_detail_cache.get(movie_id)
+            if cached is not None:
+                found[movie_id] = cached
+
+        loaded = await self._load_movie_details([i for i in ids if i not in found])
+        for detail in loaded.values():
+            movie_detail_cache.add(detail)
+        found.update(loaded)
+
+        if user_id and found:
+            # The only per-user part of the page, never cached
+            ratings = await self.session.execute(
+                select(UserRating.movie_id, UserRating.rating).where(
+                    UserRating.user_id == user_id,
+                    col(UserRating.movie_id).in_(list(found)),
+                )
             )
+            for movie_id, rating in ratings.all():
+                found[movie_id] = found[movie_id].model_copy(
+                    update={"user_rating": rating}
+                )
+
+        return (
+            [found[i] for i in ids if i in found],
+            [i for i in ids if i not in found],
         )
 
-        result = await self.session.execute(stmt)
-        movie = result.scalar_one_or_none()
+    async def get_movies(
+        self, movie_ids: list[int]
+    ) -> tuple[list[MovieSchema.Movie], list[int]]:
+        """Cards for `movie_ids` in request order, plus the ids that do not exist."""
+        ids = list(dict.fromkeys(movie_ids))
 
-        if not movie:
-            return None
+        result = await self.session.execute(
+            select(MovieCard).where(col(MovieCard.movie_id).in_(ids))
+        )
+        found = {c.movie_id: self._card_to_movie(c) for c in result.scalars()}
 
-        user_rating_value: int | None = None
-        if user_id:
-            rating_stmt = select(UserRating).where(
-                UserRating.user_id == user_id, UserRating.movie_id == movieId
-            )
-            rating_result = await self.session.execute(rating_stmt)
-            user_rating = rating_result.scalar_one_or_none()
-            if user_rating:
-                user_rating_value = user_rating.rating
-
-        return MovieSchema.MovieDetail(
-            id=movie.id,
-            original_title=movie.original_title,
-            overview=movie.overview,
-            poster_path=movie.poster_path,
-            avg_rating=movie.avg_rating,
-            genres=[g.genre for g in movie.genres],
-            actors=[a.name for a in movie.actors],
-            directors=[d.name for d in movie.directors],
-            year=movie.year.year,
-            user_rating=user_rating_value,
+        return (
+            [found[i] for i in ids if i in found],
+            [i for i in ids if i not in found],
         )
 
-    async def get_similar_movies(self, movieId: int) -> list[MovieSchema.Movie] | None:
-        # Check if movieId exist
-        stmt = (
-            select(Movie)
-            .where(Movie.id == movieId)
-            .options(
-                selectinload(cast(InstrumentedAttribute, Movie.genres)),
-                selectinload(cast(InstrumentedAttribute, Movie.actors)),
-                selectinload(cast(InstrumentedAttribute, Movie.directors)),
-            )
+    async def _load_movie_details(
+        self, movie_ids: list[int]
+    ) -> dict[int, MovieSchema.MovieDetail]:
+        if not movie_ids:
+            return {}
+
+        # One statement: names of each relation are aggregated to JSON arrays
+        stmt = text(
+            """
+            SELECT
+                m.id, m.original_title, m.overview, m.poster_path, m.avg_rating,
+                m.release_year,
+                (SELECT json_group_array(g.genre)
+                 FROM movie_genre_link l JOIN genre g ON g.id = l.genre_id
+                 WHERE l.movie_id = m.id) AS genres,
+                (SELECT json_group_array(a.name)
+                 FROM movie_actor_link l JOIN actor a ON a.id = l.actor_id
+                 WHERE l.movie_id = m.id) AS actors,
+                (SELECT json_group_array(d.name)
+                 FROM movie_director_link l JOIN director d ON d.id = l.director_id
+                 WHERE l.movie_id = m.id) AS directors
+            FROM movie m
+            WHERE m.id IN :movie_ids;
+            """
+        ).bindparams(bindparam("movie_ids", expanding=True))
+
+        result = await self.session.execute(
+            stmt,
+            {"movie_ids": movie_ids},
+            bind_arguments={"mapper": Movie},  # raw SQL: route to the catalog
         )
 
-        result = await self.session.execute(stmt)
-        movie = result.scalar_one_or_none()
+        return {
+            row.id: MovieSchema.MovieDetail(
+                id=row.id,
+                original_title=row.original_title,
+                overview=row.overview,
+                poster_path=row.poster_path,
+                avg_rating=row.avg_rating,
+                genres=json.loads(row.genres),
+                actors=json.loads(row.actors),
+                directors=json.loads(row.directors),
+                year=row.release_year,
+                user_rating=None,
+            )
+            for row in result
+        }
 
-        if not movie:
+    async def get_similar_movies(self, movieId: int) -> list[MovieSchema.Movie] | None:
+        # Check if movieId exist
+        exists = await self.session.scalar(
+            select(MovieCard.movie_id).where(MovieCard.movie_id == movieId)
+        )
+        if exists is None:
             return None
 
         # List of Movie id that are similar
-        similar_movie_ids: list[int] = await similar(movie.id)
+        similar_movie_ids: list[int] = await similar(movieId)
 
         if not similar_movie_ids:
             return []
 
-        print(f"\033[31m{similar_movie_ids}\033[0m")
-
         # Fetch all similar movies
-        stmt_similar = (
-            select(Movie)
-            .where(col(Movie.id).in_(similar_movie_ids))
-            .options(
-                selectinload(cast(InstrumentedAttribute, Movie.genres)),
-                selectinload(cast(InstrumentedAttribute, Movie.actors)),
-                selectinload(cast(InstrumentedAttribute, Movie.directors)),
-            )
+        stmt_similar = select(MovieCard).where(
+            col(MovieCard.movie_id).in_(similar_movie_ids)
         )
         result_similar = await self.session.execute(stmt_similar)
-        similar_movies = result_similar.scalars().all()
+        similar_cards = result_similar.scalars().all()
 
         # Preserve similarity order (since IN() does not guarantee order)
-        id_to_movie = {m.id: m for m in similar_movies}
-        ordered_movies = [
-            id_to_movie[mid] for mid in similar_movie_ids if mid in id_to_movie
+        id_to_card = {c.movie_id: c for c in similar_cards}
+        return [
+            self._card_to_movie(id_to_card[mid])
+            for mid in similar_movie_ids
+            if mid in id_to_card
         ]
 
-        # Convert to schema objects
-        movies_out = [
-            MovieSchema.Movie(
-                id=m.id,
-                original_title=m.original_title,
-                overview=m.overview,
-                poster_path=m.poster_path,
-                avg_rating=m.avg_rating,
-            )
-            for m in ordered_movies
-        ]
-
-        return movies_out
-
     async def build_movie_data(self):
         stmt = select(Movie).options(
             selectinload(cast(InstrumentedAttribute, Movie.genres)),
@@ -268,69 +288,84 @@ class MovieService:
         result = await self.session.execute(stmt)
         movies = result.scalars().unique().all()
 
-        for movie in movies:
-            genres = "|".join([g.genre for g in movie.genres])
-            directors = "|".join([d.name for d in movie.directors])
-            actors = "|".join([a.name for a in movie.actors])
-
-            data = MovieData(
-                movie_id=movie.id,
-                title=movie.original_title,
-                genres=genres,
-                directors=directors,
-                actors=actors,
-                overview=movie.overview,
+        rows = [
+            {
+                "movie_id": movie.id,
+                "title": movie.original_title,
+                "genres": "|".join([g.genre for g in movie.genres]),
+                "directors": "|".join([d.name for d in movie.directors]),
+                "actors": "|".join([a.name for a in movie.actors]),
+                "overview": movie.overview,
+            }
+            for movie in movies
+        ]
+        if rows:
+            # Upsert so rebuilding after a catalog sync replaces existing rows
+            stmt = sqlite_insert(MovieData)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["movie_id"],
+                set_={
+                    name: stmt.excluded[name]
+                    for name in ("title", "genres", "directors", "actors", "overview")
+                },
             )
-            self.session.add(data)
+            await self.session.execute(stmt, rows)
 
         await self.session.commit()
 
     async def rate_movie(self, movie_id: int, user_id: UUID, rating: int):
-        print(f"\033[31m Start HERE\033[0m")
-        movie_stmt = select(Movie).where(Movie.id == movie_id)
-        movie_result = await self.session.execute(movie_stmt)
-        movie = movie_result.scalar_one_or_none()
-        if not movie:
+        now = now_utc()
+        values = {
+            "user_id": user_id,
+            "movie_id": movie_id,
+            "rating": rating,
+            "is_pseudo": False,
+            "created_at": now,
+            "updated_at": now,
+        }
+        if catalog_split:
+            # movie lives in the catalog file, out of reach of the insert
+            exists = await self.session.scalar(
+                select(Movie.id).where(Movie.id == movie_id)
+            )
+            if exists is None:
+                raise HTTPException(status_code=404, detail="Movie not found")
+            stmt = sqlite_insert(UserRating).values(values)
+        else:
+            # Inserting from the movie row folds the existence check in
+            columns = UserRating.__table__.columns
+            stmt = sqlite_insert(UserRating).from_select(
+                list(values),
+                select(*(literal(v, columns[k].type) for k, v in values.items())).where(
+                    Movie.id == movie_id
+                ),
+            )
+
+        # Triggers on user_rating (src.core.rating_aggregates) apply the
+        # aggregate delta to movie and its card within this statement, or
+        # queue it in rating_delta when the catalog is split
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserRating.user_id, UserRating.movie_id],
+            set_={"rating": stmt.excluded.rating, "updated_at": now},
+        ).returning(UserRating.movie_id)
+        if (await self.session.execute(stmt)).first() is None:
             raise HTTPException(status_code=404, detail="Movie not found")
 
-        stmt = select(UserRating).where(
-            UserRating.user_id == user_id, UserRating.movie_id == movie_id
-        )
-        result = await self.session.execute(stmt)
-        existing_rating = result.scalar_one_or_none()
-
-        print(f"\033[31m{existing_rating} existing_rating\033[0m")
-        if existing_rating:
-            # Update user's previous rating
-            existing_rating.rating = rating
-            existing_rating.updated_at = now_utc()
-            print(f"\033[31m{existing_rating} PREVIOUS existing_rating\033[0m")
-        else:
-            # Add new rating
-            new_rating = UserRating(user_id=user_id, movie_id=movie_id, rating=rating)
-            self.session.add(new_rating)
-            print(f"\033[31m{existing_rating} NEW existing_rating\033[0m")
-
-        print(f"\033[31m{existing_rating} UPDATE\033[0m")
-        # Update movie stats incrementally
-        if existing_rating:
-            print(f"\033[31m{existing_rating} FUCK HOW \033[0m")
-            # If user updated their rating, recalc avg by subtracting old, adding new
-            total = movie.total_rating_users
-            movie.avg_rating = (
-                (movie.avg_rating * total) - existing_rating.rating + rating
-            ) / total
-            print(f"\033[31m{total} {movie} FUCK HOW \033[0m")
-        else:
-            # New user rating, add to total
-            total = movie.total_rating_users + 1
-            movie.avg_rating = (
-                (movie.avg_rating * movie.total_rating_users) + rating
-            ) / total
-            movie.total_rating_users = total
-            print(f"\033[31m{total} {movie} FUCK HOW \033[0m")
-
-        movie.updated_at = now_utc()
         await self.session.commit()
+        if catalog_split:
+            # Applying queued deltas is idempotent: if this fails, the next
+            # rating (or startup) applies them
+            await apply_rating_deltas(self.session)
+        movie_detail_cache.evict(movie_id)
 
         return {"success": True}
+
+    @staticmethod
+    def _card_to_movie(card: MovieCard) -> MovieSchema.Movie:
+        return MovieSchema.Movie(
+            id=card.movie_id,
+            original_title=card.original_title,
+            overview=card.overview,
+            poster_path=card.poster_path,
+            avg_rating=card.avg_rating,
+        )
@@ -38,6 +38,3 @@ class UserService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to fetch user",
             )
-
-        finally:
-            await self.session.close()
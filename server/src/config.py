@@ -5,10 +5,45 @@ class Settings(BaseSettings):
     DB_URL: str
     JWT_SECRET: str
     JWT_REFRESH_SECRET: str
+    REFRESH_HASH_SECRET: str | None = None
     ACCESS_EXPIRE_MINUTES: int = 15
     REFRESH_EXPIRE_DAYS: int = 7
     COOKIE_TOKEN: str = "AuthToken"
+    SESSION_CACHE_TTL_SECONDS: int = 60
+    SESSION_CACHE_SYNC_SECONDS: int = 5
+    SESSION_CACHE_MAX_ENTRIES: int = 50_000
+    SESSION_PRUNE_INTERVAL_SECONDS: int = 3600
+    SESSION_PRUNE_BATCH_SIZE: int = 500
+    SESSION_PRUNE_BATCH_PAUSE_MS: int = 50
+    RATING_DELTA_RETENTION_HOURS: int = 24
+    MOVIE_DETAIL_CACHE_TTL_SECONDS: int = 300
+    MOVIE_DETAIL_CACHE_SYNC_SECONDS: int = 5
+    MOVIE_DETAIL_CACHE_MAX_ENTRIES: int = 10_000
+    TRENDING_HALF_LIFE_HOURS: float = 6.0
+    TRENDING_TOP_K: int = 100
+    TRENDING_SYNC_SECONDS: int = 5
+    TRENDING_SNAPSHOT_SECONDS: int = 300
+    TRENDING_SNAPSHOT_PATH: str = "trending_snapshot.npz"
+    TRENDING_FALLBACK_YEARS: int = 8
+    EVENT_BUFFER_MAX_SIZE: int = 50_000
+    EVENT_FLUSH_BATCH_SIZE: int = 5_000
+    EVENT_FLUSH_INTERVAL_MS: int = 500
+    EVENT_RETRY_AFTER_SECONDS: int = 1
+    HASH_POOL_WORKERS: int = 2
+    HASH_POOL_MAX_PENDING: int = 32
+    HASH_POOL_RETRY_AFTER_SECONDS: int = 1
     ENV: str
+    DEBUG: bool = False
+
+    CATALOG_DB_URL: str | None = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    SQLITE_CACHE_SIZE_KB: int = 65_536
+    SQLITE_MMAP_SIZE: int = 268_435_456
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SLOW_QUERY_MS: int = 100
+    SLOW_QUERY_SAMPLE_RATE: float = 1.0
 
     model_config = SettingsConfigDict(
         env_file=".env",
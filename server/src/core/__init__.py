@@ -1,2 +1,6 @@
-from .database import init_db, get_session, engine
-from .seed import create_fts_table
+from .database import init_db, get_session, engine, async_session, catalog_split
+from .seed import create_fts_table, build_catalog, swap_catalog
+from .movie_card import refresh_movie_cards
+from .rating_aggregates import apply_rating_deltas
+from .maintenance import run_session_pruning
+from .query_stats import QueryStatsMiddleware, sql_metrics
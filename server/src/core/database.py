@@ -1,26 +1,247 @@
+import os
 from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
     AsyncSession,
     AsyncEngine,
     create_async_engine,
     async_sessionmaker,
 )
-from typing import AsyncGenerator
-from src.config import Config
+from sqlalchemy import event, inspect, text, Delete, Insert, Table, Update
+from sqlalchemy.engine import Connection, Engine, URL, make_url
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.orm import Session as SyncSession
+from typing import Any, AsyncGenerator
+from src.config import Config, Settings
+from .query_stats import instrument_engine
+from .movie_card import refresh_movie_cards
+from .rating_aggregates import apply_rating_deltas, create_rating_triggers
+from src.api.models import (
+    Movie,
+    Genre,
+    Actor,
+    Director,
+    Year,
+    MovieGenreLink,
+    MovieActorLink,
+    MovieDirectorLink,
+    MovieData,
+    MovieCard,
+    RatingWatermark,
+)
+
+# Read-mostly tables that only change when the catalog is rebuilt
+CATALOG_MODELS: tuple[type[SQLModel], ...] = (
+    Movie,
+    Genre,
+    Actor,
+    Director,
+    Year,
+    MovieGenreLink,
+    MovieActorLink,
+    MovieDirectorLink,
+    MovieData,
+    MovieCard,
+    RatingWatermark,
+)
+
+
+def _file_id(path: str) -> int | None:
+    # stat follows the catalog symlink to the generation file it points at
+    try:
+        return os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
+
+
+def create_engine(
+    settings: Settings = Config,
+    url: str | URL | None = None,
+    read_only: bool = False,
+    detect_swap: bool = False,
+) -> AsyncEngine:
+    """
+    Build the async engine with explicit pool sizing and SQLite tuning.
+
+    With `detect_swap`, a pooled connection is discarded on checkout once the
+    file it was opened on is no longer the one at the URL's path, so every
+    worker follows a catalog swap before its next read or write.
+    """
+    url = make_url(url or settings.DB_URL)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    is_memory = is_sqlite and url.database in (None, "", ":memory:")
+    path = url.database
+
+    if is_sqlite and read_only and not is_memory:
+        url = url.set(
+            database=f"file:{url.database}", query={"mode": "ro", "uri": "true"}
+        )
+
+    kwargs: dict[str, Any] = {"echo": settings.DEBUG}
+    if not is_memory:
+        kwargs.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+
+    new_engine = create_async_engine(url, **kwargs)
 
+    if is_sqlite:
+        pragmas: dict[str, Any] = {
+            "synchronous": "NORMAL",
+            "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+            "mmap_size": settings.SQLITE_MMAP_SIZE,
+            "temp_store": "MEMORY",
+            "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        }
+        if not read_only:
+            pragmas = {"journal_mode": "WAL", **pragmas}
+
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    if detect_swap and is_sqlite and not is_memory:
+
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def _remember_file(_dbapi_connection, connection_record) -> None:
+            connection_record.info["file_id"] = _file_id(path)
+
+        @event.listens_for(new_engine.sync_engine, "checkout")
+        def _check_file(_dbapi_connection, connection_record, _proxy) -> None:
+            # The pool reconnects and retries the checkout on DisconnectionError
+            if connection_record.info.get("file_id") != _file_id(path):
+                raise DisconnectionError(f"{path} was swapped")
+
+    instrument_engine(new_engine)
+    return new_engine
+
+
+engine: AsyncEngine = create_engine()
+
+# With CATALOG_DB_URL set, request traffic reads the catalog through read-only
+# connections and only catalog writes (rating aggregates, cards) use
+# catalog_writer. The catalog path is a symlink to the current generation file
+# (see seed.swap_catalog); both engines reopen it once the link moves.
+catalog_split: bool = Config.CATALOG_DB_URL is not None
+catalog_engine: AsyncEngine = (
+    create_engine(url=Config.CATALOG_DB_URL, read_only=True, detect_swap=True)
+    if catalog_split
+    else engine
+)
+catalog_writer: AsyncEngine = (
+    create_engine(url=Config.CATALOG_DB_URL, detect_swap=True)
+    if catalog_split
+    else engine
+)
 
-engine: AsyncEngine = create_async_engine(Config.DB_URL, echo=True)
+
+class RoutingSession(SyncSession):
+    """Routes catalog models to the catalog engines and everything else to `engine`."""
+
+    def get_bind(self, mapper=None, *, clause=None, **kw: Any) -> Engine | Connection:
+        # Callers may pass a mapped class rather than its mapper
+        if mapper is not None and issubclass(inspect(mapper).class_, CATALOG_MODELS):
+            if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+                return catalog_writer.sync_engine
+            return catalog_engine.sync_engine
+        return engine.sync_engine
 
 
 async def init_db() -> None:
+    catalog_tables = [model.__table__ for model in CATALOG_MODELS]
+    user_tables = [
+        table
+        for table in SQLModel.metadata.sorted_tables
+        if table not in catalog_tables
+    ]
+
+    # A split catalog is built offline (see seed.build_catalog), never at startup
+    tables = user_tables if catalog_split else SQLModel.metadata.sorted_tables
+
     async with engine.begin() as conn:
         # await conn.run_sync(SQLModel.metadata.drop_all)
-        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(SQLModel.metadata.create_all, tables=tables)
+        await conn.run_sync(_add_missing_columns, tables)
+        await conn.run_sync(_create_missing_indexes, tables)
+        await create_rating_triggers(conn, split=catalog_split)
+        if not catalog_split:
+            await _upgrade_catalog(conn)
 
+    # ...but one built by an older version is brought up to date in place
+    if catalog_split and os.path.exists(make_url(Config.CATALOG_DB_URL).database):
+        async with catalog_writer.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all, tables=catalog_tables)
+            await conn.run_sync(_add_missing_columns, catalog_tables)
+            await conn.run_sync(_create_missing_indexes, catalog_tables)
+            await _upgrade_catalog(conn)
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async_session: async_sessionmaker[AsyncSession] = async_sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
+        # Rating changes a worker queued but did not get to apply before it stopped
+        async with async_session() as session:
+            await apply_rating_deltas(session)
+
+
+async def _upgrade_catalog(conn: AsyncConnection) -> None:
+    """Backfill catalog data added after a catalog was first built."""
+    await conn.execute(text("""
+            UPDATE movie
+            SET release_year = (SELECT year FROM year WHERE year.id = movie.year_id)
+            WHERE release_year IS NULL
+            """))
+
+    # Aggregates so far already include every rating: nothing queued to apply
+    await conn.execute(
+        text("INSERT OR IGNORE INTO rating_watermark (id, last_delta_id) VALUES (1, 0)")
     )
+
+    # First start after movie_card was introduced: build it once
+    card_count = await conn.scalar(text("SELECT COUNT(*) FROM movie_card"))
+    if not card_count:
+        await refresh_movie_cards(conn)
+
+
+def _add_missing_columns(conn: Connection, tables: list[Table]) -> None:
+    # create_all never alters existing tables; add nullable columns added later
+    existing = inspect(conn)
+    for table in tables:
+        present = {c["name"] for c in existing.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(
+                f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+            )
+
+
+def _create_missing_indexes(conn: Connection, tables: list[Table]) -> None:
+    # create_all skips existing tables, including indexes added to them later
+    for table in tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+# Single sessionmaker for the whole process. Sessions only check out a pooled
+# connection on their first statement, so requests answered from a cache never
+# touch the pool.
+async_session: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession if catalog_split else SyncSession,
+    expire_on_commit=False,
+)
+
+
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Request-scoped unit of work.
+
+    FastAPI caches dependencies per request, so auth_guard and every service
+    resolved for the same request share this one session.
+    """
     async with async_session() as session:
         yield session
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from datetime import timedelta
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import select, col, or_, and_
+
+from src.config import Config
+from src.api.models import RatingDelta, RatingWatermark, Session
+from src.api.utils import now_utc
+from .database import catalog_split
+from .rating_aggregates import apply_rating_deltas
+
+logger = logging.getLogger("maintenance")
+
+
+async def prune_sessions(session: AsyncSession, batch_size: int) -> int:
+    """
+    Delete invalidated sessions and sessions whose refresh token has expired.
+
+    Rows are removed in small batches, each in its own transaction, so the
+    SQLite write lock is only held briefly. Invalidated sessions are kept for
+    one access-token lifetime so other workers' session caches can still see
+    the invalidation before the row disappears.
+    """
+    now = now_utc()
+    refresh_cutoff = now - timedelta(days=Config.REFRESH_EXPIRE_DAYS)
+    invalid_cutoff = now - timedelta(minutes=Config.ACCESS_EXPIRE_MINUTES)
+
+    # invalid_cutoff is the later of the two, so the outer bound lets
+    # ix_session_updated_at range-scan just the rows old enough for either rule
+    condition = and_(
+        col(Session.updated_at) < invalid_cutoff,
+        or_(col(Session.updated_at) < refresh_cutoff, Session.valid == False),
+    )
+
+    pruned = 0
+    while True:
+        result = await session.execute(
+            select(Session.id).where(condition).limit(batch_size)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            break
+
+        await session.execute(delete(Session).where(col(Session.id).in_(ids)))
+        await session.commit()
+        pruned += len(ids)
+
+        # Leave the write lock free long enough for other workers to take it
+        await asyncio.sleep(Config.SESSION_PRUNE_BATCH_PAUSE_MS / 1000)
+
+    return pruned
+
+
+async def prune_rating_deltas(session: AsyncSession, batch_size: int) -> int:
+    """
+    Delete rating_delta rows the catalog has applied, in batches like
+    prune_sessions.
+
+    Rows are kept for RATING_DELTA_RETENTION_HOURS after they were queued: a
+    catalog build that read user_rating before they arrived replays them once
+    it is swapped in, even when the live catalog already applied them.
+    """
+    applied = await session.scalar(select(RatingWatermark.last_delta_id))
+    if not applied:
+        return 0
+    cutoff = now_utc() - timedelta(hours=Config.RATING_DELTA_RETENTION_HOURS)
+    condition = and_(
+        col(RatingDelta.id) <= applied, col(RatingDelta.created_at) < cutoff
+    )
+
+    pruned = 0
+    while True:
+        result = await session.execute(
+            select(RatingDelta.id)
+            .where(condition)
+            .order_by(col(RatingDelta.id))
+            .limit(batch_size)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            break
+
+        await session.execute(delete(RatingDelta).where(col(RatingDelta.id).in_(ids)))
+        await session.commit()
+        pruned += len(ids)
+
+        await asyncio.sleep(Config.SESSION_PRUNE_BATCH_PAUSE_MS / 1000)
+
+    return pruned
+
+
+async def run_session_pruning(async_session: async_sessionmaker[AsyncSession]) -> None:
+    """Background loop that keeps the session and rating_delta tables bounded."""
+    while True:
+        try:
+            async with async_session() as session:
+                pruned = await prune_sessions(session, Config.SESSION_PRUNE_BATCH_SIZE)
+                if catalog_split:
+                    # Backstop for deltas a failed rate_movie left queued
+                    await apply_rating_deltas(session)
+                    deltas = await prune_rating_deltas(
+                        session, Config.SESSION_PRUNE_BATCH_SIZE
+                    )
+                    if deltas:
+                        logger.info(f"[PRUNE] Deleted {deltas} applied rating deltas")
+            if pruned:
+                logger.info(f"[PRUNE] Deleted {pruned} stale sessions")
+        except Exception as e:
+            logger.exception("Session pruning failed: %s", e)
+        await asyncio.sleep(Config.SESSION_PRUNE_INTERVAL_SECONDS)
@@ -0,0 +1,63 @@
+from typing import Any, Iterable
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlmodel import col
+from src.api.models import Genre, Movie, MovieCard, MovieGenreLink
+
+
+def _card_statements(movie_ids: list[int] | None) -> tuple[Any, Any]:
+    genres = (
+        select(func.coalesce(func.group_concat(Genre.genre, "|"), ""))
+        .select_from(MovieGenreLink)
+        .join(Genre, col(Genre.id) == col(MovieGenreLink.genre_id))
+        .where(col(MovieGenreLink.movie_id) == col(Movie.id))
+        .scalar_subquery()
+    )
+    source = select(
+        Movie.id,
+        Movie.original_title,
+        Movie.overview,
+        Movie.poster_path,
+        Movie.avg_rating,
+        Movie.total_rating_users,
+        Movie.popularity_score,
+        Movie.release_year,
+        genres,
+    )
+    clear = delete(MovieCard)
+
+    if movie_ids is not None:
+        source = source.where(col(Movie.id).in_(movie_ids))
+        clear = clear.where(col(MovieCard.movie_id).in_(movie_ids))
+
+    fill = insert(MovieCard).from_select(
+        [
+            "movie_id",
+            "original_title",
+            "overview",
+            "poster_path",
+            "avg_rating",
+            "total_rating_users",
+            "popularity_score",
+            "release_year",
+            "genres",
+        ],
+        source,
+    )
+    return clear, fill
+
+
+async def refresh_movie_cards(
+    db: AsyncSession | AsyncConnection, movie_ids: Iterable[int] | None = None
+) -> None:
+    """
+    Rebuild movie_card rows from movie/genre, for `movie_ids` or the whole table.
+
+    Runs inside the caller's transaction; the caller commits.
+    """
+    ids = None if movie_ids is None else list(movie_ids)
+    if ids == []:
+        return
+
+    for statement in _card_statements(ids):
+        await db.execute(statement)
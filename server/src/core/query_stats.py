@@ -0,0 +1,158 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Any
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import Config
+
+slow_query_logger = logging.getLogger("slow_query")
+
+
+class QueryStats:
+    """Statements issued while serving one request."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: str | None = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+
+class EndpointStats:
+    """Aggregated statement counts and DB time for one route."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.db_time = 0.0
+        self.max_db_time = 0.0
+
+    def add(self, stats: QueryStats) -> None:
+        self.requests += 1
+        self.statements += stats.count
+        self.max_statements = max(self.max_statements, stats.count)
+        self.db_time += stats.total_time
+        self.max_db_time = max(self.max_db_time, stats.total_time)
+
+    def as_dict(self) -> dict[str, Any]:
+        requests = self.requests or 1
+        return {
+            "requests": self.requests,
+            "statements_avg": round(self.statements / requests, 2),
+            "statements_max": self.max_statements,
+            "db_ms_avg": round(self.db_time / requests * 1000, 3),
+            "db_ms_max": round(self.max_db_time * 1000, 3),
+        }
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+endpoint_stats: dict[str, EndpointStats] = {}
+slow_queries_logged = 0
+
+
+def sql_metrics() -> dict[str, Any]:
+    return {
+        "slow_query_ms": Config.SLOW_QUERY_MS,
+        "slow_queries_logged": slow_queries_logged,
+        "endpoints": {path: s.as_dict() for path, s in endpoint_stats.items()},
+    }
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement on `engine` and attribute it to the current request."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+        if (
+            elapsed * 1000 >= Config.SLOW_QUERY_MS
+            and random.random() < Config.SLOW_QUERY_SAMPLE_RATE
+        ):
+            _log_slow_query(conn, statement, parameters, elapsed, executemany)
+
+
+def _log_slow_query(conn, statement, parameters, elapsed, executemany) -> None:
+    global slow_queries_logged
+    slow_queries_logged += 1
+
+    plan = None
+    if (
+        not executemany
+        and conn.dialect.name == "sqlite"
+        and statement.lstrip().upper().startswith(("SELECT", "WITH"))
+    ):
+        # Explain on a raw cursor so this does not re-enter the event hooks
+        try:
+            cursor = conn.connection.cursor()
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plan = " | ".join(str(row[-1]) for row in cursor.fetchall())
+            cursor.close()
+        except Exception as e:
+            plan = f"<unavailable: {e}>"
+
+    # Parameters are left out on purpose: they can carry credentials and tokens
+    slow_query_logger.warning(
+        "[SLOW QUERY] %.1f ms: %s | plan=%s",
+        elapsed * 1000,
+        " ".join(statement.split()),
+        plan,
+    )
+
+
+class QueryStatsMiddleware:
+    """
+    Collects per-request SQL stats, aggregates them per route and, with DEBUG
+    on, reports them in X-DB-Queries / X-DB-Time-Ms / X-DB-Slowest-Ms headers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start" and Config.DEBUG:
+                headers = list(message.get("headers", []))
+                headers += [
+                    (b"x-db-queries", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.total_time * 1000:.3f}".encode()),
+                    (b"x-db-slowest-ms", f"{stats.slowest_time * 1000:.3f}".encode()),
+                ]
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "<unmatched>"
+            endpoint_stats.setdefault(path, EndpointStats()).add(stats)
@@ -0,0 +1,242 @@
+import numpy as np
+from sqlalchemy import DateTime, bindparam, column, func, insert, table, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlmodel import col, select, text
+
+from src.api.models import Movie, RatingDelta, RatingWatermark, UserRating
+from src.api.utils import now_utc
+from .movie_card import refresh_movie_cards
+
+# Triggers keeping movie.avg_rating / total_rating_users in step with the
+# ratings of real users. Pseudo (imported) ratings are skipped: their
+# aggregates are set in bulk by recompute_movie_ratings.
+INSERT_TRIGGER = "user_rating_aggregate_insert"
+UPDATE_TRIGGER = "user_rating_aggregate_update"
+
+# One file: movie and its card change in the statement that changed the rating
+_MOVIE_TRIGGERS = {
+    INSERT_TRIGGER: """
+        CREATE TRIGGER user_rating_aggregate_insert
+        AFTER INSERT ON user_rating WHEN NEW.is_pseudo = 0
+        BEGIN
+            UPDATE movie
+            SET avg_rating = (avg_rating * total_rating_users + NEW.rating)
+                    / (total_rating_users + 1),
+                total_rating_users = total_rating_users + 1,
+                updated_at = NEW.updated_at
+            WHERE id = NEW.movie_id;
+            UPDATE movie_card
+            SET (avg_rating, total_rating_users) = (
+                SELECT avg_rating, total_rating_users FROM movie WHERE id = NEW.movie_id
+            )
+            WHERE movie_id = NEW.movie_id;
+        END
+        """,
+    UPDATE_TRIGGER: """
+        CREATE TRIGGER user_rating_aggregate_update
+        AFTER UPDATE OF rating ON user_rating
+        WHEN NEW.is_pseudo = 0 AND NEW.rating != OLD.rating
+        BEGIN
+            UPDATE movie
+            SET avg_rating = (avg_rating * total_rating_users + NEW.rating - OLD.rating)
+                    / MAX(total_rating_users, 1),
+                updated_at = NEW.updated_at
+            WHERE id = NEW.movie_id;
+            UPDATE movie_card
+            SET (avg_rating, total_rating_users) = (
+                SELECT avg_rating, total_rating_users FROM movie WHERE id = NEW.movie_id
+            )
+            WHERE movie_id = NEW.movie_id;
+        END
+        """,
+}
+
+# Split catalog: movie lives in another file, so the change is queued in
+# rating_delta, still in the rating's transaction, for apply_rating_deltas
+_QUEUE_TRIGGERS = {
+    INSERT_TRIGGER: """
+        CREATE TRIGGER user_rating_aggregate_insert
+        AFTER INSERT ON user_rating WHEN NEW.is_pseudo = 0
+        BEGIN
+            INSERT INTO rating_delta (movie_id, rating_delta, users_delta, created_at)
+            VALUES (NEW.movie_id, NEW.rating, 1, NEW.updated_at);
+        END
+        """,
+    UPDATE_TRIGGER: """
+        CREATE TRIGGER user_rating_aggregate_update
+        AFTER UPDATE OF rating ON user_rating
+        WHEN NEW.is_pseudo = 0 AND NEW.rating != OLD.rating
+        BEGIN
+            INSERT INTO rating_delta (movie_id, rating_delta, users_delta, created_at)
+            VALUES (NEW.movie_id, NEW.rating - OLD.rating, 0, NEW.updated_at);
+        END
+        """,
+}
+
+# Raw SQL otherwise routes to the read-only catalog engine; an UPDATE clause
+# sends it to the catalog writer (see RoutingSession.get_bind)
+CATALOG_WRITE = {"mapper": Movie, "clause": update(Movie)}
+
+rating_totals = table(
+    "rating_totals", column("movie_id"), column("total"), column("count")
+)
+
+
+async def create_rating_triggers(conn: AsyncConnection, split: bool) -> None:
+    """(Re)create the user_rating triggers for a single-file or split database."""
+    triggers = _QUEUE_TRIGGERS if split else _MOVIE_TRIGGERS
+    for name, ddl in triggers.items():
+        await conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+        await conn.exec_driver_sql(ddl)
+
+
+async def apply_rating_deltas(session: AsyncSession) -> list[int]:
+    """
+    Fold queued rating_delta rows into a split catalog's movie aggregates.
+
+    rating_watermark holds the last delta id applied to this catalog. It is
+    read and advanced in the same catalog transaction as the movie updates,
+    so each delta is applied exactly once whichever worker gets to it, and
+    deltas left behind by a crash are picked up by the next call. Returns the
+    ids of the movies changed.
+    """
+    # A write first: holds the catalog's write lock before the watermark is read
+    applied = await session.scalar(
+        update(RatingWatermark)
+        .values(last_delta_id=RatingWatermark.last_delta_id)
+        .returning(RatingWatermark.last_delta_id)
+    )
+    if applied is None:
+        await session.rollback()
+        return []
+
+    result = await session.execute(
+        select(
+            RatingDelta.movie_id,
+            func.sum(RatingDelta.rating_delta),
+            func.sum(RatingDelta.users_delta),
+            func.max(RatingDelta.id),
+        )
+        .where(col(RatingDelta.id) > applied)
+        .group_by(RatingDelta.movie_id)
+    )
+    deltas = result.all()
+    if not deltas:
+        await session.rollback()
+        return []
+
+    await session.execute(
+        text("""
+            UPDATE movie
+            SET avg_rating = (avg_rating * total_rating_users + :rating_delta)
+                    / MAX(total_rating_users + :users_delta, 1),
+                total_rating_users = total_rating_users + :users_delta,
+                updated_at = :now
+            WHERE id = :movie_id
+            """).bindparams(bindparam("now", type_=DateTime())),
+        [
+            {
+                "movie_id": movie_id,
+                "rating_delta": rating_delta,
+                "users_delta": users_delta,
+                "now": now_utc(),
+            }
+            for movie_id, rating_delta, users_delta, _ in deltas
+        ],
+        bind_arguments=CATALOG_WRITE,
+    )
+    await session.execute(
+        update(RatingWatermark).values(
+            last_delta_id=max(last_id for *_, last_id in deltas)
+        )
+    )
+    movie_ids = [movie_id for movie_id, *_ in deltas]
+    await refresh_movie_cards(session, movie_ids)
+    await session.commit()
+    return movie_ids
+
+
+async def recompute_movie_ratings(
+    session: AsyncSession, base_sums: np.ndarray, base_counts: np.ndarray
+) -> None:
+    """
+    Set avg_rating / total_rating_users of every rated movie in one UPDATE.
+
+    `base_sums` / `base_counts` (indexed by movie id) hold the MovieLens
+    ratings at their raw values, rather than the whole stars stored in
+    user_rating, so the averages keep the source's precision. Ratings of real
+    users are added from user_rating with one GROUP BY. That query runs
+    separately because user_rating may live in another file than a split
+    catalog; it also reads the newest rating_delta id in the same snapshot,
+    which becomes the catalog's watermark so queued deltas already counted
+    here are not applied again. The combined totals go into a temp table on
+    the catalog connection, which a single UPDATE ... FROM applies to movie.
+    """
+    sums = base_sums.copy()
+    counts = base_counts.copy()
+    real = await session.execute(
+        text("""
+            SELECT w.last_id, r.movie_id, r.total, r.count
+            FROM (SELECT COALESCE(MAX(id), 0) AS last_id FROM rating_delta) AS w
+            LEFT JOIN (
+                SELECT movie_id, SUM(rating) AS total, COUNT(*) AS count
+                FROM user_rating
+                WHERE is_pseudo = 0
+                GROUP BY movie_id
+            ) AS r ON 1 = 1
+            """),
+        bind_arguments={"mapper": UserRating},
+    )
+    last_delta_id = 0
+    for last_delta_id, movie_id, total, count in real.all():
+        if movie_id is not None and movie_id < len(sums):
+            sums[movie_id] += total
+            counts[movie_id] += count
+
+    watermark = sqlite_insert(RatingWatermark).values(id=1, last_delta_id=last_delta_id)
+    await session.execute(
+        watermark.on_conflict_do_update(
+            index_elements=["id"],
+            set_={"last_delta_id": watermark.excluded.last_delta_id},
+        )
+    )
+
+    rated = np.flatnonzero(counts)
+    if not len(rated):
+        return
+
+    await session.execute(
+        text(
+            "CREATE TEMP TABLE IF NOT EXISTS rating_totals "
+            "(movie_id INTEGER PRIMARY KEY, total REAL, count INTEGER)"
+        ),
+        bind_arguments=CATALOG_WRITE,
+    )
+    await session.execute(
+        text("DELETE FROM rating_totals"), bind_arguments=CATALOG_WRITE
+    )
+    await session.execute(
+        insert(rating_totals),
+        [
+            {"movie_id": movie_id, "total": total, "count": count}
+            for movie_id, total, count in zip(
+                rated.tolist(), sums[rated].tolist(), counts[rated].tolist()
+            )
+        ],
+        bind_arguments=CATALOG_WRITE,
+    )
+    await session.execute(
+        text("""
+            UPDATE movie
+            SET avg_rating = ROUND(t.total / t.count, 2),
+                total_rating_users = t.count,
+                updated_at = :now
+            FROM rating_totals AS t
+            WHERE movie.id = t.movie_id
+            """).bindparams(bindparam("now", now_utc(), type_=DateTime())),
+        bind_arguments=CATALOG_WRITE,
+    )
+    await session.execute(
+        text("DROP TABLE rating_totals"), bind_arguments=CATALOG_WRITE
+    )
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import time
+import numpy as np
+import pandas as pd
+from uuid import NAMESPACE_URL, UUID, uuid5
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from src.api.models import Movie, User, UserRating
+from .database import async_session, engine, init_db
+from .movie_card import refresh_movie_cards
+from .rating_aggregates import recompute_movie_ratings
+from .seed import BASE_PATH, bulk_insert
+
+RATINGS_PATH = f"{BASE_PATH}/ratings.csv"
+# Rows of ratings.csv per transaction
+RATINGS_CHUNK_SIZE = 200_000
+
+PSEUDO_USER_NAMESPACE = uuid5(NAMESPACE_URL, "filmflare:movielens-user")
+
+
+def pseudo_user_id(movielens_user_id: int) -> UUID:
+    """Stable id for a MovieLens user, so reimports map to the same pseudo user."""
+    return uuid5(PSEUDO_USER_NAMESPACE, str(movielens_user_id))
+
+
+async def import_ratings(
+    session: AsyncSession,
+    path: str = RATINGS_PATH,
+    chunk_size: int = RATINGS_CHUNK_SIZE,
+) -> int:
+    """
+    Load MovieLens ratings as pseudo users and `is_pseudo` ratings.
+
+    The file is read in typed chunks, each inserted with executemany in one
+    transaction and in primary-key order. Secondary indexes on user_rating are
+    dropped for the load and rebuilt once at the end. Movie rating aggregates
+    are summed from the raw ratings as they stream past and written with the
+    cards in set-based statements. Ratings for movies outside the catalog are
+    skipped; rerunning the import adds nothing new.
+    """
+    movie_ids = list((await session.execute(select(Movie.id))).scalars())
+    known_users: set[int] = set()
+    # Per-movie sum and count of the raw half-star ratings, indexed by movie id
+    size = max(movie_ids, default=0) + 1
+    rating_sums = np.zeros(size, dtype=np.float64)
+    rating_counts = np.zeros(size, dtype=np.int64)
+
+    # Building indexes once over the loaded table beats updating them per row
+    conn = await session.connection(bind_arguments={"mapper": UserRating})
+    deferred = list(UserRating.__table__.indexes)
+    for index in deferred:
+        await conn.run_sync(lambda c, index=index: index.drop(c, checkfirst=True))
+
+    try:
+        print("Importing ratings...")
+        started = time.perf_counter()
+        read = imported = 0
+        reader = pd.read_csv(
+            path,
+            usecols=["userId", "movieId", "rating", "timestamp"],
+            dtype={
+                "userId": "int32",
+                "movieId": "int32",
+                "rating": "float32",
+                "timestamp": "int64",
+            },
+            chunksize=chunk_size,
+        )
+        for chunk in reader:
+            read += len(chunk)
+            chunk = chunk[chunk["movieId"].isin(movie_ids)]
+
+            user_ids = {
+                int(u): pseudo_user_id(int(u)) for u in chunk["userId"].unique()
+            }
+            new_users = [
+                {"id": user_ids[u], "name": f"MovieLens user {u}"}
+                for u in user_ids.keys() - known_users
+            ]
+            known_users.update(user_ids)
+            await bulk_insert(session, User, new_users)
+
+            raw = chunk["rating"].to_numpy(dtype=np.float64)
+            movies = chunk["movieId"].to_numpy()
+            rating_sums += np.bincount(movies, weights=raw, minlength=size)
+            rating_counts += np.bincount(movies, minlength=size)
+
+            # MovieLens uses half stars from 0.5; user_rating holds whole stars 1-5.
+            # Halves round to even so they are not all biased upwards.
+            stars = np.clip(np.rint(raw), 1, 5).astype(int)
+            rated_at = pd.to_datetime(chunk["timestamp"], unit="s", utc=True)
+            rows = [
+                {
+                    "user_id": user_ids[user],
+                    "movie_id": movie,
+                    "rating": rating,
+                    "is_pseudo": True,
+                    "created_at": at,
+                    "updated_at": at,
+                }
+                for user, movie, rating, at in zip(
+                    chunk["userId"].tolist(),
+                    chunk["movieId"].tolist(),
+                    stars.tolist(),
+                    rated_at.tolist(),
+                )
+            ]
+            # Appending in (user_id, movie_id) order keeps primary-key inserts in order
+            rows.sort(key=lambda r: (r["user_id"].hex, r["movie_id"]))
+            await bulk_insert(session, UserRating, rows)
+            await session.commit()
+
+            imported += len(rows)
+            rate = read / max(time.perf_counter() - started, 1e-9)
+            print(f"  {read} rows read, {imported} catalog ratings ({rate:.0f} rows/s)")
+    finally:
+        # Also after a failed or interrupted load, or user_rating stays unindexed
+        await session.rollback()
+        conn = await session.connection(bind_arguments={"mapper": UserRating})
+        for index in deferred:
+            await conn.run_sync(lambda c, index=index: index.create(c, checkfirst=True))
+        await session.commit()
+
+    await recompute_movie_ratings(session, rating_sums, rating_counts)
+    await refresh_movie_cards(session)
+    await session.commit()
+    print(f"Ratings imported ({imported} rows, {len(known_users)} pseudo users).")
+    return imported
+
+
+async def main(path: str, chunk_size: int) -> None:
+    await init_db()
+    async with async_session() as session:
+        await import_ratings(session, path, chunk_size)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Import MovieLens ratings as pseudo users"
+    )
+    parser.add_argument("path", nargs="?", default=RATINGS_PATH)
+    parser.add_argument("--chunk-size", type=int, default=RATINGS_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.path, args.chunk_size))
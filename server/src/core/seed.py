@@ -1,7 +1,18 @@
+import argparse
 import asyncio
+import hashlib
 import json
+import os
+import time
+import numpy as np
 import pandas as pd
-from sqlmodel import select, text
+from collections import Counter
+from uuid import UUID, uuid4
+from sqlmodel import SQLModel, col, select, text
+from typing import Any
+from sqlalchemy import bindparam, column, delete, insert, table, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from src.api.models import (
     Genre,
@@ -11,12 +22,30 @@ from src.api.models import (
     MovieActorLink,
     MovieDirectorLink,
     MovieGenreLink,
+    RatingDelta,
+    UserRating,
     Year,
 )
+from src.api.utils import now_utc
+from src.config import Config
 from src.core import init_db
-from .database import engine
+from .movie_card import refresh_movie_cards
+from .rating_aggregates import apply_rating_deltas, recompute_movie_ratings
+from .database import (
+    async_session,
+    catalog_engine,
+    catalog_writer,
+    catalog_split,
+    create_engine,
+    engine,
+    CATALOG_MODELS,
+)
 
 BASE_PATH = "src/data/datasets"
+# Rows per executemany; each table is still committed in one transaction
+SEED_BATCH_SIZE = 10_000
+# Rows of clean_data.csv per transaction in streaming mode
+IMPORT_CHUNK_SIZE = 5_000
 
 
 def load_data(filename: str) -> pd.DataFrame:
@@ -34,16 +63,57 @@ def load_data(filename: str) -> pd.DataFrame:
         raise ValueError(f"Unsupported file type: {filename}")
 
 
+def _split_names(value: object) -> list[str]:
+    """Split a "A|B|C" cell into stripped names; NaN and blanks give []."""
+    if not isinstance(value, str):
+        return []
+    return [name.strip() for name in value.split("|") if name.strip()]
+
+
+async def bulk_insert(
+    session: AsyncSession, model: type[SQLModel], rows: list[dict]
+) -> None:
+    """executemany INSERT ... ON CONFLICT DO NOTHING in SEED_BATCH_SIZE chunks."""
+    # Core insert on the table skips the ORM bulk-persistence bookkeeping;
+    # the mapper is still passed so a routing session picks the right engine
+    stmt = sqlite_insert(model.__table__).on_conflict_do_nothing()
+    for start in range(0, len(rows), SEED_BATCH_SIZE):
+        await session.execute(
+            stmt,
+            rows[start : start + SEED_BATCH_SIZE],
+            bind_arguments={"mapper": model},
+        )
+
+
 async def seed_genres(session: AsyncSession):
     df = load_data("genre_image_urls.json")
     print("Seeding Genres...")
-    for _, row in df.iterrows():
-        exists = await session.scalar(select(Genre).where(Genre.genre == row["genre"]))
-        if not exists:
-            genre = Genre(genre=row["genre"], image_url=row.get("image_url"))
-            session.add(genre)
+    existing = set((await session.execute(select(Genre.genre))).scalars())
+
+    rows = {}
+    for genre, image_url in zip(df["genre"], df["image_url"]):
+        if genre not in existing and genre not in rows:
+            rows[genre] = {"id": uuid4(), "genre": genre, "image_url": image_url}
+
+    await bulk_insert(session, Genre, list(rows.values()))
     await session.commit()
-    print("Genres seeded.")
+    print(f"Genres seeded ({len(rows)} new).")
+
+
+async def _seed_people(
+    session: AsyncSession,
+    model: type[Actor] | type[Director],
+    names: set[str],
+    images: dict[str, str],
+) -> int:
+    existing = set((await session.execute(select(model.name))).scalars())
+    rows = [
+        {"id": uuid4(), "name": name, "image_url": images.get(name)}
+        for name in names - existing
+    ]
+    await bulk_insert(session, model, rows)
+    await session.commit()
+    return len(rows)
 
 
 async def seed_actors(
@@ -55,16 +125,11 @@ async def seed_actors(
 
     # Extract all unique actors from clean_data.csv
     unique_actors = set()
-    for a_list in df_movies["actors"].dropna():
-        unique_actors.update([a.strip() for a in a_list.split("|")])
-
-    for name in unique_actors:
-        exists = await session.scalar(select(Actor).where(Actor.name == name))
-        if not exists:
-            actor = Actor(name=name, image_url=actor_images.get(name))
-            session.add(actor)
-    await session.commit()
-    print("Actors seeded.")
+    for a_list in df_movies["actors"]:
+        unique_actors.update(_split_names(a_list))
+
+    count = await _seed_people(session, Actor, unique_actors, actor_images)
+    print(f"Actors seeded ({count} new).")
 
 
 async def seed_directors(
@@ -74,30 +139,128 @@ async def seed_directors(
     director_images = df_director_images.set_index("director")["image_url"].to_dict()
 
     unique_directors = set()
-    for d_list in df_movies["directors"].dropna():
-        unique_directors.update([d.strip() for d in d_list.split("|")])
-
-    for name in unique_directors:
-        exists = await session.scalar(select(Director).where(Director.name == name))
-        if not exists:
-            director = Director(name=name, image_url=director_images.get(name))
-            session.add(director)
-    await session.commit()
-    print("Directors seeded.")
+    for d_list in df_movies["directors"]:
+        unique_directors.update(_split_names(d_list))
+
+    count = await _seed_people(session, Director, unique_directors, director_images)
+    print(f"Directors seeded ({count} new).")
 
 
 async def seed_years(session: AsyncSession):
     df_years = load_data("movie_year.csv")
     print("Seeding Years...")
 
-    unique_years = df_years["year"].unique()
-    for y in unique_years:
-        exists = await session.scalar(select(Year).where(Year.year == int(y)))
-        if not exists:
-            year = Year(year=int(y))
-            session.add(year)
+    existing = set((await session.execute(select(Year.year))).scalars())
+    rows = [
+        {"id": uuid4(), "year": int(y)}
+        for y in df_years["year"].dropna().unique()
+        if int(y) not in existing
+    ]
+    await bulk_insert(session, Year, rows)
     await session.commit()
-    print("Years seeded.")
+    print(f"Years seeded ({len(rows)} new).")
+
+
+async def _load_key_maps(session: AsyncSession) -> dict[str, dict]:
+    """Name/year → id maps for every table movie rows link to, one query each."""
+    return {
+        "genre": dict((await session.execute(select(Genre.genre, Genre.id))).all()),
+        "actor": dict((await session.execute(select(Actor.name, Actor.id))).all()),
+        "director": dict(
+            (await session.execute(select(Director.name, Director.id))).all()
+        ),
+        "year": dict((await session.execute(select(Year.year, Year.id))).all()),
+    }
+
+
+def _content_hash(
+    row: Any, year: int, genres: set[str], actors: set[str], directors: set[str]
+) -> str:
+    """
+    Digest of the source fields a movie and its links are built from.
+
+    The rating aggregates are left out: after seeding they are owned by
+    rate_movie, so a sync must neither compare nor overwrite them.
+    """
+    fields = [
+        row.original_title,
+        row.overview,
+        row.original_language,
+        row.poster_path,
+        f"{float(row.popularity_score):.6g}",
+        str(year),
+        "|".join(sorted(genres)),
+        "|".join(sorted(actors)),
+        "|".join(sorted(directors)),
+    ]
+    return hashlib.sha1("\x1f".join(map(str, fields)).encode("utf-8")).hexdigest()
+
+
+def _movie_rows(
+    df_movies: pd.DataFrame, key_maps: dict[str, dict], existing_tmdb_ids: set[int]
+) -> dict[type[SQLModel], list[dict]]:
+    """
+    Build movie and link rows for movies not in `existing_tmdb_ids`.
+
+    `df_movies` needs a `year` column; rows without a known year are skipped.
+    `existing_tmdb_ids` is updated so duplicates within the input are dropped.
+    """
+    genre_ids, actor_ids = key_maps["genre"], key_maps["actor"]
+    director_ids, year_ids = key_maps["director"], key_maps["year"]
+
+    movies: list[dict] = []
+    genre_links: list[dict] = []
+    actor_links: list[dict] = []
+    director_links: list[dict] = []
+
+    for row in df_movies.itertuples(index=False):
+        tmdb_id = int(row.tmdbId)
+        if tmdb_id in existing_tmdb_ids or pd.isna(row.year):
+            continue
+
+        year = int(row.year)
+        year_id = year_ids.get(year)
+        if not year_id:
+            continue
+
+        existing_tmdb_ids.add(tmdb_id)
+        movie_id = int(row.movieId)
+        genres = set(_split_names(row.genres))
+        actors = set(_split_names(row.actors))
+        directors = set(_split_names(row.directors))
+        movies.append(
+            {
+                "id": movie_id,
+                "original_title": row.original_title,
+                "overview": row.overview,
+                "original_language": row.original_language,
+                "poster_path": row.poster_path,
+                "avg_rating": float(row.avg_rating),
+                "total_rating_users": int(row.total_rating_users),
+                "popularity_score": float(row.popularity_score),
+                "tmdb_id": tmdb_id,
+                "year_id": year_id,
+                "release_year": year,
+                "content_hash": _content_hash(row, year, genres, actors, directors),
+            }
+        )
+
+        # Link genres, actors and directors; sets drop repeated names in a row
+        for name in genres & genre_ids.keys():
+            genre_links.append({"movie_id": movie_id, "genre_id": genre_ids[name]})
+        for name in actors & actor_ids.keys():
+            actor_links.append({"movie_id": movie_id, "actor_id": actor_ids[name]})
+        for name in directors & director_ids.keys():
+            director_links.append(
+                {"movie_id": movie_id, "director_id": director_ids[name]}
+            )
+
+    return {
+        Movie: movies,
+        MovieGenreLink: genre_links,
+        MovieActorLink: actor_links,
+        MovieDirectorLink: director_links,
+    }
 
 
 async def seed_movies(session: AsyncSession):
@@ -110,108 +273,573 @@ async def seed_movies(session: AsyncSession):
     await seed_directors(session, df_movies, df_director_images)
 
     print("Seeding Movies...")
-    # Load genres from DB
-    genre_map = {g.genre: g for g in (await session.execute(select(Genre))).scalars()}
-    # Load actors/directors from DB
-    actor_map = {a.name: a for a in (await session.execute(select(Actor))).scalars()}
-    director_map = {
-        d.name: d for d in (await session.execute(select(Director))).scalars()
-    }
-    year_map = {y.year: y for y in (await session.execute(select(Year))).scalars()}
+    key_maps = await _load_key_maps(session)
+    existing_tmdb_ids = set((await session.execute(select(Movie.tmdb_id))).scalars())
 
     df_movies = df_movies.merge(df_years, on="movieId", how="left")
+    rows_by_model = _movie_rows(df_movies, key_maps, existing_tmdb_ids)
+
+    # One large transaction per table
+    for model, rows in rows_by_model.items():
+        await bulk_insert(session, model, rows)
+        await session.commit()
 
-    for _, row in df_movies.iterrows():
-        exists = await session.scalar(
-            select(Movie).where(Movie.tmdb_id == row["tmdbId"])
+    links = sum(len(rows) for rows in rows_by_model.values()) - len(
+        rows_by_model[Movie]
+    )
+    print(f"Movies seeded ({len(rows_by_model[Movie])} new, {links} links).")
+
+
+def _read_checkpoint(checkpoint_path: str, source: str) -> int:
+    """Rows of `source` already imported, or 0 if the source changed since."""
+    if not os.path.exists(checkpoint_path):
+        return 0
+
+    with open(checkpoint_path, "r") as f:
+        checkpoint = json.load(f)
+    stat = os.stat(source)
+    if (
+        checkpoint.get("source") != source
+        or checkpoint.get("size") != stat.st_size
+        or checkpoint.get("mtime") != stat.st_mtime
+    ):
+        return 0
+    return int(checkpoint["rows_done"])
+
+
+def _write_checkpoint(checkpoint_path: str, source: str, rows_done: int) -> None:
+    stat = os.stat(source)
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(
+            {
+                "source": source,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "rows_done": rows_done,
+            },
+            f,
+        )
+    os.replace(tmp_path, checkpoint_path)
+
+
+async def _add_people(
+    session: AsyncSession,
+    model: type[Actor] | type[Director],
+    cells: pd.Series,
+    ids: dict[str, UUID],
+    images: dict[str, str],
+) -> None:
+    names = set()
+    for cell in cells:
+        names.update(_split_names(cell))
+
+    rows = []
+    for name in names - ids.keys():
+        ids[name] = uuid4()
+        rows.append({"id": ids[name], "name": name, "image_url": images.get(name)})
+    await bulk_insert(session, model, rows)
+
+
+async def _add_chunk_people(
+    session: AsyncSession,
+    chunk: pd.DataFrame,
+    key_maps: dict[str, dict],
+    images: dict[str, dict],
+) -> None:
+    for model, role in ((Actor, "actor"), (Director, "director")):
+        await _add_people(
+            session, model, chunk[f"{role}s"], key_maps[role], images[role]
         )
-        if exists:
-            continue
 
-        year_obj = year_map.get(int(row["year"]))
-        if not year_obj:
-            continue
 
-        movie_data = {
-            "id": row["movieId"],
-            "original_title": row["original_title"],
-            "overview": row["overview"],
-            "original_language": row["original_language"],
-            "poster_path": row["poster_path"],
-            "avg_rating": row["avg_rating"],
-            "total_rating_users": row["total_rating_users"],
-            "popularity_score": row["popularity_score"],
-            "tmdb_id": row["tmdbId"],
-            "year_id": year_obj.id,
-        }
-        movie = Movie(**movie_data)
+async def _prepare_stream(
+    session: AsyncSession,
+) -> tuple[dict[int, int], dict[str, dict], dict[str, dict]]:
+    """
+    Load what chunked imports resolve rows against: movieId → year, the
+    name → id key maps (adding missing years) and, per role, name → image url.
+    """
+    movie_years: dict[int, int] = {}
+    for chunk in pd.read_csv(
+        f"{BASE_PATH}/movie_year.csv", usecols=["movieId", "year"], chunksize=100_000
+    ):
+        chunk = chunk.dropna()
+        movie_years.update(zip(chunk["movieId"].astype(int), chunk["year"].astype(int)))
+
+    key_maps = await _load_key_maps(session)
+    year_rows = [
+        {"id": uuid4(), "year": year}
+        for year in set(movie_years.values()) - key_maps["year"].keys()
+    ]
+    key_maps["year"].update((row["year"], row["id"]) for row in year_rows)
+    await bulk_insert(session, Year, year_rows)
+    await session.commit()
 
-        # Link genres
-        for g_name in row["genres"].split("|"):
-            genre = genre_map.get(g_name.strip())
-            if genre:
-                movie.genres.append(genre)
+    # Summaries hold one row per person, far smaller than the catalog
+    images = {
+        role: load_data(f"{role}_summary.csv").set_index(role)["image_url"].to_dict()
+        for role in ("actor", "director")
+    }
+    return movie_years, key_maps, images
 
-        # Link actors
-        for a_name in row["actors"].split("|"):
-            actor = actor_map.get(a_name.strip())
-            if actor:
-                movie.actors.append(actor)
 
-        # Link directors
-        for d_name in row["directors"].split("|"):
-            director = director_map.get(d_name.strip())
-            if director:
-                movie.directors.append(director)
+async def import_catalog_streaming(
+    session: AsyncSession,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    checkpoint_path: str | None = None,
+):
+    """
+    Import clean_data.csv in fixed-size chunks with bounded memory.
 
-        session.add(movie)
-        await session.flush()  # So movie.id is available for relationships
+    Only the movieId → year and name → id maps are held in memory. Each chunk
+    (new people, movies and links) is written in one transaction, after which a
+    checkpoint records the rows done, so an interrupted import resumes at the
+    next chunk. The checkpoint is discarded when the source file changes.
+    """
+    source = f"{BASE_PATH}/clean_data.csv"
+    checkpoint_path = checkpoint_path or f"{source}.checkpoint"
+    rows_done = _read_checkpoint(checkpoint_path, source)
+    if rows_done:
+        print(f"Resuming catalog import after {rows_done} rows...")
+    else:
+        print("Importing catalog...")
 
-    await session.commit()
-    print("Movies seeded.")
+    movie_years, key_maps, images = await _prepare_stream(session)
 
+    started = time.perf_counter()
+    rows_this_run = imported = 0
+    reader = pd.read_csv(source, chunksize=chunk_size, skiprows=range(1, rows_done + 1))
+    for chunk in reader:
+        chunk["year"] = chunk["movieId"].map(movie_years)
 
-async def seed_db():
-    await init_db()
+        await _add_chunk_people(session, chunk, key_maps, images)
+
+        tmdb_ids = [int(t) for t in chunk["tmdbId"]]
+        existing_tmdb_ids = set(
+            (
+                await session.execute(
+                    select(Movie.tmdb_id).where(col(Movie.tmdb_id).in_(tmdb_ids))
+                )
+            ).scalars()
+        )
+        rows_by_model = _movie_rows(chunk, key_maps, existing_tmdb_ids)
+        for model, rows in rows_by_model.items():
+            await bulk_insert(session, model, rows)
+        await session.commit()
+
+        rows_done += len(chunk)
+        rows_this_run += len(chunk)
+        imported += len(rows_by_model[Movie])
+        _write_checkpoint(checkpoint_path, source, rows_done)
+
+        rate = rows_this_run / max(time.perf_counter() - started, 1e-9)
+        print(
+            f"  {rows_done} rows read, {imported} movies imported ({rate:.0f} rows/s)"
+        )
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f"Catalog imported ({imported} new movies).")
+
+
+# Owned by rate_movie once seeded; a sync never writes them
+RATING_COLUMNS = ("avg_rating", "total_rating_users")
+
+# movie_id column of each link table, keyed by link model
+LINK_COLUMNS: dict[type[SQLModel], str] = {
+    MovieGenreLink: "genre_id",
+    MovieActorLink: "actor_id",
+    MovieDirectorLink: "director_id",
+}
+
+
+async def _sync_links(
+    session: AsyncSession,
+    model: type[SQLModel],
+    movie_ids: list[int],
+    rows: list[dict],
+) -> None:
+    """Make the links of `movie_ids` in `model` equal `rows`, touching only the diff."""
+    table = model.__table__
+    key = LINK_COLUMNS[model]
+
+    current = await session.execute(
+        select(table.c.movie_id, table.c[key]).where(table.c.movie_id.in_(movie_ids))
+    )
+    have = set(current.tuples())
+    want = {(row["movie_id"], row[key]) for row in rows}
+
+    stale = [{"b_movie_id": m, "b_key": k} for m, k in have - want]
+    if stale:
+        await session.execute(
+            delete(table).where(
+                table.c.movie_id == bindparam("b_movie_id"),
+                table.c[key] == bindparam("b_key"),
+            ),
+            stale,
+            bind_arguments={"mapper": model},
+        )
+    await bulk_insert(session, model, [{"movie_id": m, key: k} for m, k in want - have])
 
-    async_session = async_sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
+
+async def _reject_id_conflicts(
+    session: AsyncSession, new_movies: list[dict], chunk_movies: list[dict]
+) -> tuple[list[dict], list[dict]]:
+    """
+    Split `new_movies` into insertable rows and those whose movieId is taken,
+    either by a stored movie or by another tmdb_id in the same chunk.
+    """
+    if not new_movies:
+        return [], []
+
+    ids = [movie["id"] for movie in new_movies]
+    taken = set(
+        (await session.execute(select(Movie.id).where(col(Movie.id).in_(ids))))
+        .scalars()
+        .all()
     )
+    claimed = Counter(movie["id"] for movie in chunk_movies)
+
+    accepted, conflicts = [], []
+    for movie in new_movies:
+        if movie["id"] in taken or claimed[movie["id"]] > 1:
+            conflicts.append(movie)
+        else:
+            accepted.append(movie)
+    return accepted, conflicts
+
+
+async def sync_catalog(
+    session: AsyncSession, chunk_size: int = IMPORT_CHUNK_SIZE
+) -> dict[str, int]:
+    """
+    Upsert clean_data.csv into an existing catalog, writing only what changed.
+
+    Movies are matched on tmdb_id and compared by content hash. New movies
+    are inserted; changed movies are updated and only their link-table diffs
+    are written; unchanged movies are not touched. Each chunk is one
+    transaction, and cards and title-index entries are refreshed for the
+    movies it touched. The rating aggregates of stored movies are never
+    written. A new movie whose movieId is already taken by another tmdb_id is
+    reported and skipped. Returns inserted / updated / unchanged / conflicts
+    counts.
+    """
+    source = f"{BASE_PATH}/clean_data.csv"
+    print("Syncing catalog...")
+    await seed_genres(session)
+    movie_years, key_maps, images = await _prepare_stream(session)
+
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "conflicts": 0}
+    for chunk in pd.read_csv(source, chunksize=chunk_size):
+        chunk["year"] = chunk["movieId"].map(movie_years)
+        await _add_chunk_people(session, chunk, key_maps, images)
+
+        tmdb_ids = [int(t) for t in chunk["tmdbId"]]
+        stored = {
+            tmdb_id: (movie_id, content_hash)
+            for tmdb_id, movie_id, content_hash in (
+                await session.execute(
+                    select(Movie.tmdb_id, Movie.id, Movie.content_hash).where(
+                        col(Movie.tmdb_id).in_(tmdb_ids)
+                    )
+                )
+            ).all()
+        }
+        rows_by_model = _movie_rows(chunk, key_maps, set())
+
+        new_movies, changed_movies = [], []
+        # Source movieId → stored id, in case a known tmdb_id was renumbered
+        stored_ids: dict[int, int] = {}
+        for movie in rows_by_model[Movie]:
+            if movie["tmdb_id"] not in stored:
+                new_movies.append(movie)
+                continue
+
+            movie_id, content_hash = stored[movie["tmdb_id"]]
+            if content_hash == movie["content_hash"]:
+                counts["unchanged"] += 1
+                continue
+
+            stored_ids[movie["id"]] = movie_id
+            changed_movies.append(
+                {
+                    **{k: v for k, v in movie.items() if k not in RATING_COLUMNS},
+                    "id": movie_id,
+                    "updated_at": now_utc(),
+                }
+            )
+
+        new_movies, conflicts = await _reject_id_conflicts(
+            session, new_movies, rows_by_model[Movie]
+        )
+        for movie in conflicts:
+            print(
+                f"  Skipped tmdb_id {movie['tmdb_id']}: movieId {movie['id']} "
+                "already belongs to another movie"
+            )
+
+        new_ids = set()
+        if new_movies:
+            inserted = await session.execute(
+                sqlite_insert(Movie.__table__)
+                .on_conflict_do_nothing()
+                .returning(Movie.__table__.c.id),
+                new_movies,
+                bind_arguments={"mapper": Movie},
+            )
+            new_ids = set(inserted.scalars())
+        if changed_movies:
+            await session.execute(update(Movie), changed_movies)
+
+        for model in LINK_COLUMNS:
+            links = rows_by_model[model]
+            await bulk_insert(
+                session, model, [link for link in links if link["movie_id"] in new_ids]
+            )
+            if stored_ids:
+                await _sync_links(
+                    session,
+                    model,
+                    list(stored_ids.values()),
+                    [
+                        {**link, "movie_id": stored_ids[link["movie_id"]]}
+                        for link in links
+                        if link["movie_id"] in stored_ids
+                    ],
+                )
+
+        touched = list(new_ids) + list(stored_ids.values())
+        await refresh_movie_cards(session, touched)
+        await refresh_title_index(session, touched)
+        await session.commit()
+
+        counts["inserted"] += len(new_ids)
+        counts["updated"] += len(changed_movies)
+        counts["conflicts"] += len(conflicts)
+
+    print(
+        f"Catalog synced ({counts['inserted']} inserted, {counts['updated']} updated, "
+        f"{counts['unchanged']} unchanged, {counts['conflicts']} id conflicts)."
+    )
+    return counts
+
+
+async def seed_db(streaming: bool = False, chunk_size: int = IMPORT_CHUNK_SIZE):
+    await init_db()
+
+    if catalog_split:
+        await build_catalog(streaming, chunk_size)
+        return
 
     async with async_session() as session:
-        await seed_genres(session)
+        await seed_catalog(session, streaming, chunk_size)
+
+
+async def seed_catalog(
+    session: AsyncSession,
+    streaming: bool = False,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    checkpoint_path: str | None = None,
+):
+    await seed_genres(session)
+    if streaming:
+        await import_catalog_streaming(session, chunk_size, checkpoint_path)
+    else:
         await seed_years(session)
         await seed_movies(session)
+    await refresh_movie_cards(session)
+    await session.commit()
 
 
 async def create_fts_table(session: AsyncSession):
     # Create virtual FTS5 table for movie title search
-    await session.execute(
-        text(
-            """
+    await session.execute(text("""
         CREATE VIRTUAL TABLE IF NOT EXISTS movie_title_fts
         USING fts5(
             movie_id UNINDEXED,
             title,
             tokenize='unicode61'
         );
-    """
-        )
-    )
+    """))
 
     # Populate table from Movie
     await session.execute(text("DELETE FROM movie_title_fts;"))
-    await session.execute(
-        text(
-            """
+    await session.execute(text("""
         INSERT INTO movie_title_fts(movie_id, title)
         SELECT id, original_title FROM movie;
+    """))
+    await session.commit()
+
+
+movie_title_fts = table("movie_title_fts", column("movie_id"), column("title"))
+
+
+async def refresh_title_index(session: AsyncSession, movie_ids: list[int]) -> None:
+    """Rewrite the FTS entries of `movie_ids`; a missing index is left to startup."""
+    if not movie_ids:
+        return
+
+    exists = await session.scalar(
+        text("SELECT 1 FROM sqlite_master WHERE name = 'movie_title_fts'"),
+        bind_arguments={"mapper": Movie},
+    )
+    if not exists:
+        return
+
+    # Core DML (not text) so a routing session sends it to the catalog writer
+    await session.execute(
+        delete(movie_title_fts).where(movie_title_fts.c.movie_id.in_(movie_ids)),
+        bind_arguments={"mapper": Movie},
+    )
+    await session.execute(
+        insert(movie_title_fts).from_select(
+            ["movie_id", "title"],
+            select(Movie.id, Movie.original_title).where(col(Movie.id).in_(movie_ids)),
+        ),
+        bind_arguments={"mapper": Movie},
+    )
+
+
+async def build_catalog(streaming: bool = False, chunk_size: int = IMPORT_CHUNK_SIZE):
     """
+    Build a fresh catalog file beside the live one, then swap it in.
+
+    Rating aggregates are recomputed from user_rating before the swap. Ratings
+    written meanwhile are queued in rating_delta beyond the new catalog's
+    watermark and applied to it right after.
+
+    A streaming build that was interrupted resumes into the same build file.
+    """
+    catalog_path = make_url(Config.CATALOG_DB_URL).database
+    build_path = f"{catalog_path}.build"
+    checkpoint_path = f"{build_path}.checkpoint"
+    if not (streaming and os.path.exists(checkpoint_path)):
+        for suffix in ("", "-journal", "-wal", "-shm", ".checkpoint"):
+            if os.path.exists(build_path + suffix):
+                os.remove(build_path + suffix)
+
+    build_engine = create_engine(url=f"sqlite+aiosqlite:///{build_path}")
+    async with build_engine.begin() as conn:
+        await conn.run_sync(
+            SQLModel.metadata.create_all,
+            tables=[model.__table__ for model in CATALOG_MODELS],
         )
+
+    # Catalog tables in the build file; the ratings are read from the live
+    # user database
+    build_session = async_sessionmaker(
+        build_engine,
+        class_=AsyncSession,
+        binds={UserRating: engine, RatingDelta: engine},
+        expire_on_commit=False,
     )
-    await session.commit()
+    async with build_session() as session:
+        await seed_catalog(session, streaming, chunk_size, checkpoint_path)
+        await create_fts_table(session)
+        # Seeded aggregates are the source's; fold in the users' ratings
+        await recompute_movie_ratings(session, *await _seeded_rating_totals(session))
+        await refresh_movie_cards(session)
+        await session.commit()
+
+    # Fold the WAL back in so the catalog is one self-contained file
+    async with build_engine.connect() as conn:
+        await conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+    await build_engine.dispose()
+
+    await swap_catalog(build_path)
+
+    # Ratings written while the build ran were queued past its watermark
+    async with async_session() as session:
+        replayed = await apply_rating_deltas(session)
+    print(f"Replayed ratings of {len(replayed)} movies rated during the build.")
+
+
+async def _seeded_rating_totals(session: AsyncSession) -> tuple[np.ndarray, np.ndarray]:
+    """Per-movie rating sums and counts of the seeded movie rows, indexed by id."""
+    rows = (
+        await session.execute(
+            select(Movie.id, Movie.avg_rating, Movie.total_rating_users)
+        )
+    ).all()
+    size = max((movie_id for movie_id, *_ in rows), default=0) + 1
+    sums = np.zeros(size, dtype=np.float64)
+    counts = np.zeros(size, dtype=np.int64)
+    for movie_id, avg, total in rows:
+        sums[movie_id] = avg * total
+        counts[movie_id] = total
+    return sums, counts
+
+
+async def swap_catalog(new_path: str):
+    """
+    Atomically make `new_path` the live catalog.
+
+    The catalog path is a symlink to a generation file. The new file is
+    renamed to a fresh generation and the link is replaced in one rename.
+    SQLite names the WAL and shared-memory files after the link's target, so
+    connections still open on the old generation (in any worker) keep working
+    on their own files and never touch the new one's; each engine reopens on
+    the new generation at its next checkout. The generation before the
+    previous one is deleted.
+    """
+    catalog_path = make_url(Config.CATALOG_DB_URL).database
+    generation_path = f"{catalog_path}.{time.time_ns()}"
+    os.replace(new_path, generation_path)
+
+    link_path = f"{catalog_path}.link"
+    if os.path.lexists(link_path):
+        os.remove(link_path)
+    os.symlink(os.path.basename(generation_path), link_path)
+    previous = os.path.realpath(catalog_path) if os.path.islink(catalog_path) else None
+    os.replace(link_path, catalog_path)
+
+    # This worker moves over right away; the others follow on their next checkout
+    await catalog_writer.dispose()
+    await catalog_engine.dispose()
+
+    if previous is None:
+        # Swapped over a plain file from before generations: its side files
+        # are named after the link now and would only confuse a reader
+        for suffix in ("-journal", "-wal", "-shm"):
+            if os.path.exists(catalog_path + suffix):
+                os.remove(catalog_path + suffix)
+
+    keep = {os.path.abspath(generation_path), previous}
+    prefix = os.path.basename(catalog_path) + "."
+    directory = os.path.dirname(os.path.abspath(catalog_path))
+    for name in os.listdir(directory):
+        suffix = name[len(prefix) :].split("-")[0]
+        path = os.path.join(directory, prefix + suffix)
+        if name.startswith(prefix) and suffix.isdigit() and path not in keep:
+            os.remove(os.path.join(directory, name))
+    print(f"Catalog swapped in: {catalog_path} -> {generation_path}")
+
+
+async def sync_db(chunk_size: int = IMPORT_CHUNK_SIZE):
+    await init_db()
+    async with async_session() as session:
+        await sync_catalog(session, chunk_size)
 
 
 if __name__ == "__main__":
-    asyncio.run(seed_db())
+    parser = argparse.ArgumentParser(description="Seed the movie catalog")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--stream",
+        action="store_true",
+        help="import clean_data.csv in resumable fixed-size chunks",
+    )
+    mode.add_argument(
+        "--sync",
+        action="store_true",
+        help="upsert changed rows of clean_data.csv into the existing catalog",
+    )
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.sync:
+        asyncio.run(sync_db(chunk_size=args.chunk_size))
+    else:
+        asyncio.run(seed_db(streaming=args.stream, chunk_size=args.chunk_size))
     print("Database seeded.")
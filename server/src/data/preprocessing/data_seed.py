@@ -1,153 +1,307 @@
-import pandas as pd
-import requests
-import time
+import argparse
+import asyncio
 import math
+import os
+import time
+import numpy as np
+import pandas as pd
 from typing import Dict, Any
 
-# TMDB API settings
-TMDB_API_KEY = ""  # Replace with your actual key
-TMDB_BASE_URL = "https://api.themoviedb.org/3/movie/"
-TMDB_POSTER_BASE_URL = "https://image.tmdb.org/t/p/w500"  # For poster paths
+from tmdb_client import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE,
+    TMDB_API_URL,
+    TMDB_IMAGE_BASE as TMDB_POSTER_BASE_URL,  # For poster paths
+    TMDBClient,
+)
+
+DETAIL_COLUMNS = [
+    "original_title",
+    "overview",
+    "original_language",
+    "poster_path",
+    "actors",
+    "directors",
+]
+EMPTY_DETAILS: Dict[str, Any] = {column: "N/A" for column in DETAIL_COLUMNS}
+RATING_DTYPES = {"userId": "int32", "movieId": "int32", "rating": "float32"}
+RATINGS_CHUNK_SIZE = 1_000_000
 
 
-def fetch_tmdb_details(tmdb_id: int) -> Dict[str, Any]:
+def parse_tmdb_details(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract title, overview, original_language, poster_path, actors (top 5) and
+    directors from a TMDB movie response with appended credits.
+    """
+    title = data.get("title", "N/A")
+    overview = data.get("overview", "N/A")
+    original_language = data.get("original_language", "N/A")
+    poster_path = (
+        f"{TMDB_POSTER_BASE_URL}{data.get('poster_path')}"
+        if data.get("poster_path")
+        else "N/A"
+    )
+
+    # Actors: Top 5 by popularity/order
+    actors = [cast["name"] for cast in data.get("credits", {}).get("cast", [])[:5]]
+    actors_str = "|".join(actors) if actors else "N/A"
+
+    # Directors: From crew
+    directors = [
+        crew["name"]
+        for crew in data.get("credits", {}).get("crew", [])
+        if crew["job"] == "Director"
+    ]
+    directors_str = "|".join(directors) if directors else "N/A"
+
+    return {
+        "original_title": title,
+        "overview": overview,
+        "original_language": original_language,
+        "poster_path": poster_path,
+        "actors": actors_str,
+        "directors": directors_str,
+    }
+
+
+async def fetch_tmdb_details(client: TMDBClient, tmdb_id: int) -> Dict[str, Any] | None:
     """
     Fetch movie details from TMDB API.
-    Returns a dict with title, overview, original_language, poster_path, actors (top 5), directors.
+    Returns None when TMDB could not be reached, so the id is retried next run.
     """
-    url = f"{TMDB_BASE_URL}{tmdb_id}?api_key={TMDB_API_KEY}&append_to_response=credits"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-
-        # Extract fields
-        title = data.get("title", "N/A")
-        overview = data.get("overview", "N/A")
-        original_language = data.get("original_language", "N/A")
-        poster_path = (
-            f"{TMDB_POSTER_BASE_URL}{data.get('poster_path')}"
-            if data.get("poster_path")
-            else "N/A"
-        )
+    status, data = await client.fetch(f"/movie/{tmdb_id}", append_to_response="credits")
+    if status is None:
+        return None
+    if status == 404:
+        return dict(EMPTY_DETAILS)
+    return parse_tmdb_details(data)
+
+
+async def enrich_movies(
+    tmdb_ids: list[int],
+    client: TMDBClient,
+    checkpoint_path: str,
+    batch_size: int = 200,
+) -> pd.DataFrame:
+    """
+    Fetch details for every id not yet in the checkpoint CSV.
 
-        # Actors: Top 5 by popularity/order
-        actors = [cast["name"] for cast in data.get("credits", {}).get("cast", [])[:5]]
-        actors_str = "|".join(actors) if actors else "N/A"
+    Ids are fetched concurrently in batches; each finished batch is appended
+    to the checkpoint, so a crash loses at most one batch. Failed ids are not
+    written and are fetched again on the next run.
+    """
+    done: set[int] = set()
+    if os.path.exists(checkpoint_path):
+        done = set(pd.read_csv(checkpoint_path, usecols=["tmdbId"])["tmdbId"])
+    todo = [tmdb_id for tmdb_id in dict.fromkeys(tmdb_ids) if tmdb_id not in done]
+    print(f"{len(done)} movies already enriched, {len(todo)} to fetch.")
 
-        # Directors: From crew
-        directors = [
-            crew["name"]
-            for crew in data.get("credits", {}).get("crew", [])
-            if crew["job"] == "Director"
+    started = time.perf_counter()
+    for start in range(0, len(todo), batch_size):
+        batch = todo[start : start + batch_size]
+        results = await asyncio.gather(
+            *(fetch_tmdb_details(client, tmdb_id) for tmdb_id in batch)
+        )
+        rows = [
+            {"tmdbId": tmdb_id, **details}
+            for tmdb_id, details in zip(batch, results)
+            if details is not None
         ]
-        directors_str = "|".join(directors) if directors else "N/A"
-
-        return {
-            "original_title": title,
-            "overview": overview,
-            "original_language": original_language,
-            "poster_path": poster_path,
-            "actors": actors_str,
-            "directors": directors_str,
-        }
-    except requests.exceptions.RequestException as e:
-        print(f"⚠️ Error fetching TMDB ID {tmdb_id}: {e}")
-        return {
-            "original_title": "N/A",
-            "overview": "N/A",
-            "original_language": "N/A",
-            "poster_path": "N/A",
-            "actors": "N/A",
-            "directors": "N/A",
-        }
 
+        pd.DataFrame(rows, columns=["tmdbId", *DETAIL_COLUMNS]).to_csv(
+            checkpoint_path,
+            mode="a",
+            header=not os.path.exists(checkpoint_path),
+            index=False,
+        )
 
-# Step 1: Load datasets
-print("Loading MovieLens datasets...")
-links_df = pd.read_csv("./data/links.csv")
-movies_df = pd.read_csv("./data/movies.csv")
-ratings_df = pd.read_csv("./data/ratings.csv")
-print(
-    f"Loaded {len(movies_df)} movies, {len(links_df)} links, {len(ratings_df)} ratings."
-)
+        fetched = start + len(batch)
+        rate = fetched / max(time.perf_counter() - started, 1e-9)
+        print(
+            f"Processed {fetched}/{len(todo)} movies ({rate:.1f}/s, "
+            f"{len(batch) - len(rows)} failed in batch)"
+        )
 
-# Step 2: Compute rating stats
-print("Computing average ratings and total rating users...")
-rating_stats = (
-    ratings_df.groupby("movieId")
-    .agg(avg_rating=("rating", "mean"), total_rating_users=("userId", "nunique"))
-    .reset_index()
-)
+    if not os.path.exists(checkpoint_path):
+        return pd.DataFrame(columns=["tmdbId", *DETAIL_COLUMNS])
+    return pd.read_csv(checkpoint_path).drop_duplicates("tmdbId", keep="last")
 
-# Step 3: Merge datasets
-print("Merging datasets...")
-merged_df = links_df.merge(movies_df, on="movieId", how="left").merge(
-    rating_stats, on="movieId", how="left"
-)
-print(f"Merged dataset shape: {merged_df.shape}")
-
-# Step 4: Fill NaNs and compute popularity
-print("Filling missing values and computing popularity score...")
-merged_df["avg_rating"] = merged_df["avg_rating"].fillna(0)
-merged_df["total_rating_users"] = merged_df["total_rating_users"].fillna(0)
-merged_df["popularity_score"] = merged_df["avg_rating"] * merged_df[
-    "total_rating_users"
-].apply(lambda x: math.log(x + 1))
-
-# Step 5: Fetch TMDB details
-print("🎬 Fetching TMDB details (this may take a while)...")
-tmdb_details = []
-progress_interval = 50  # print progress every N movies
-
-for idx, row in merged_df.iterrows():
-    tmdb_id = row["tmdbId"]
-    if pd.notna(tmdb_id):
-        details = fetch_tmdb_details(int(tmdb_id))
-        tmdb_details.append(details)
+
+def compute_rating_stats(ratings_df: pd.DataFrame) -> pd.DataFrame:
+    return (
+        ratings_df.groupby("movieId")
+        .agg(avg_rating=("rating", "mean"), total_rating_users=("userId", "nunique"))
+        .reset_index()
+    )
+
+
+def _count_user_movie_pairs(keys: np.ndarray, users: np.ndarray) -> None:
+    """Add one per distinct (user, movie) key to `users`, indexed by movie."""
+    movies = (np.unique(keys) & 0xFFFFFFFF).astype(np.intp)
+    users += np.bincount(movies, minlength=len(users))
+
+
+def aggregate_ratings_chunked(
+    path: str, n_movies: int = 0, chunk_size: int = RATINGS_CHUNK_SIZE
+) -> pd.DataFrame:
+    """
+    Same result as compute_rating_stats, streaming `path` in typed chunks.
+
+    Sums and counts are kept in NumPy arrays indexed by movieId (grown if a
+    larger id turns up), so memory depends on the number of movies and the
+    chunk size, not on the file size. Distinct users are counted exactly by
+    relying on the dump being sorted by userId, as MovieLens dumps are: only
+    the last user's ratings are held back across a chunk boundary.
+    """
+    rating_sums = np.zeros(n_movies, dtype=np.float64)
+    rating_counts = np.zeros(n_movies, dtype=np.int64)
+    distinct_users = np.zeros(n_movies, dtype=np.int64)
+    # (userId << 32 | movieId) keys of the user the previous chunk ended on
+    carry = np.empty(0, dtype=np.int64)
+    last_user = -1
+
+    for chunk in pd.read_csv(
+        path,
+        usecols=list(RATING_DTYPES),
+        dtype=RATING_DTYPES,
+        chunksize=chunk_size,
+    ):
+        user_ids = chunk["userId"].to_numpy()
+        movie_ids = chunk["movieId"].to_numpy()
+        if user_ids[0] < last_user or (np.diff(user_ids) < 0).any():
+            raise ValueError(
+                f"{path} is not sorted by userId; use the in-memory aggregation"
+            )
+        last_user = int(user_ids[-1])
+
+        size = int(movie_ids.max()) + 1
+        if size > n_movies:
+            grow = (0, max(size, 2 * n_movies) - n_movies)
+            rating_sums = np.pad(rating_sums, grow)
+            rating_counts = np.pad(rating_counts, grow)
+            distinct_users = np.pad(distinct_users, grow)
+            n_movies = len(rating_sums)
+
+        rating_sums += np.bincount(
+            movie_ids, weights=chunk["rating"].to_numpy(), minlength=n_movies
+        )
+        rating_counts += np.bincount(movie_ids, minlength=n_movies)
+
+        keys = np.concatenate(
+            [carry, (user_ids.astype(np.int64) << 32) | movie_ids.astype(np.int64)]
+        )
+        # The last user's ratings may continue in the next chunk
+        held = (keys >> 32) == last_user
+        _count_user_movie_pairs(keys[~held], distinct_users)
+        carry = keys[held]
+
+    _count_user_movie_pairs(carry, distinct_users)
+
+    movie_ids = np.flatnonzero(rating_counts)
+    return pd.DataFrame(
+        {
+            "movieId": movie_ids,
+            "avg_rating": rating_sums[movie_ids] / rating_counts[movie_ids],
+            "total_rating_users": distinct_users[movie_ids],
+        }
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Step 1: Load datasets
+    print("Loading MovieLens datasets...")
+    links_df = pd.read_csv(f"{args.data_dir}/links.csv")
+    movies_df = pd.read_csv(f"{args.data_dir}/movies.csv")
+    print(f"Loaded {len(movies_df)} movies, {len(links_df)} links.")
+
+    # Step 2: Compute rating stats
+    print("Computing average ratings and total rating users...")
+    ratings_path = f"{args.data_dir}/ratings.csv"
+    if args.ratings_chunk_size:
+        rating_stats = aggregate_ratings_chunked(
+            ratings_path,
+            n_movies=int(movies_df["movieId"].max()) + 1,
+            chunk_size=args.ratings_chunk_size,
+        )
     else:
-        tmdb_details.append(
-            {
-                "original_title": "N/A",
-                "overview": "N/A",
-                "original_language": "N/A",
-                "poster_path": "N/A",
-                "actors": "N/A",
-                "directors": "N/A",
-            }
+        rating_stats = compute_rating_stats(
+            pd.read_csv(ratings_path, dtype=RATING_DTYPES)
         )
+    print(f"Rating stats for {len(rating_stats)} movies.")
 
-    # Progress log
-    # if (idx + 1) % progress_interval == 0:
-    #     print(f"Processed {int(idx) + 1}/{len(merged_df)} movies...")
+    # Step 3: Merge datasets
+    print("Merging datasets...")
+    merged_df = links_df.merge(movies_df, on="movieId", how="left").merge(
+        rating_stats, on="movieId", how="left"
+    )
+    print(f"Merged dataset shape: {merged_df.shape}")
 
-    time.sleep(0.25)  # Rate limit: ~4 requests/sec
+    # Step 4: Fill NaNs and compute popularity
+    print("Filling missing values and computing popularity score...")
+    merged_df["avg_rating"] = merged_df["avg_rating"].fillna(0)
+    merged_df["total_rating_users"] = merged_df["total_rating_users"].fillna(0)
+    merged_df["popularity_score"] = merged_df["avg_rating"] * merged_df[
+        "total_rating_users"
+    ].apply(lambda x: math.log(x + 1))
 
-print("Finished fetching TMDB details.")
+    # Step 5: Fetch TMDB details
+    print("🎬 Fetching TMDB details...")
+    client = TMDBClient(
+        base_url=args.api_url,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        cache_path=args.cache,
+    )
+    try:
+        tmdb_ids = [int(t) for t in merged_df["tmdbId"].dropna()]
+        tmdb_df = await enrich_movies(tmdb_ids, client, args.checkpoint)
+    finally:
+        client.close()
+    print(f"Finished fetching TMDB details: {client.stats}")
 
-# Step 6: Merge enriched data
-print("Combining TMDB details with base dataset...")
-tmdb_df = pd.DataFrame(tmdb_details)
-enriched_df = pd.concat([merged_df, tmdb_df], axis=1)
+    # Step 6: Merge enriched data, keyed on tmdbId rather than row position
+    print("Combining TMDB details with base dataset...")
+    enriched_df = merged_df.merge(tmdb_df, on="tmdbId", how="left")
+    enriched_df[DETAIL_COLUMNS] = enriched_df[DETAIL_COLUMNS].fillna("N/A")
 
-# Step 7: Reorder and save
-print("Saving enriched dataset to 'enriched_movies.csv'...")
-columns_order = [
-    "movieId",
-    "original_title",
-    "genres",
-    "actors",
-    "directors",
-    "overview",
-    "original_language",
-    "poster_path",
-    "avg_rating",
-    "total_rating_users",
-    "popularity_score",
-    "imdbId",
-    "tmdbId",
-]
-enriched_df = enriched_df[columns_order]
+    # Step 7: Reorder and save
+    print(f"Saving enriched dataset to '{args.out}'...")
+    columns_order = [
+        "movieId",
+        "original_title",
+        "genres",
+        "actors",
+        "directors",
+        "overview",
+        "original_language",
+        "poster_path",
+        "avg_rating",
+        "total_rating_users",
+        "popularity_score",
+        "imdbId",
+        "tmdbId",
+    ]
+    enriched_df = enriched_df[columns_order]
+
+    enriched_df.to_csv(args.out, index=False)
+    print(f"Enriched dataset saved successfully to '{args.out}'.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enrich MovieLens with TMDB details")
+    parser.add_argument("--data-dir", default="./data")
+    parser.add_argument("--out", default="enriched_movies.csv")
+    parser.add_argument("--checkpoint", default="enriched_movies.checkpoint.csv")
+    parser.add_argument("--cache", default="tmdb_cache.sqlite")
+    parser.add_argument("--api-url", default=TMDB_API_URL)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument(
+        "--ratings-chunk-size",
+        type=int,
+        default=0,
+        help=f"Stream ratings.csv in chunks of this many rows, e.g. {RATINGS_CHUNK_SIZE}",
+    )
+    args = parser.parse_args()
 
-enriched_df.to_csv("enriched_movies.csv", index=False)
-print("Enriched dataset saved successfully to 'enriched_movies.csv'.")
+    asyncio.run(main(args))
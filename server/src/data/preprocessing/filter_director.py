@@ -1,52 +1,53 @@
+import asyncio
 import pandas as pd
-import requests
 
+from person_images import build_parser, fetch_person_images
+from tmdb_client import TMDBClient
 
-TMDB_IMAGE_BASE = "https://image.tmdb.org/t/p/w500"
-TMDB_API_KEY = "549d74d021bd35eac9d680ec3ec9aacf"
 
+def build_director_summary(df: pd.DataFrame) -> pd.DataFrame:
+    df_director = df[df["total_rating_users"] >= 30]
 
-df = pd.read_csv("./data/clean_data.csv")
+    director_counts = df_director["directors"].value_counts().reset_index()
+    director_counts.columns = ["director", "movie_count"]
 
-print(df.isnull().sum())
+    avg_ratings = df_director.groupby("directors")["avg_rating"].mean().reset_index()
+    avg_ratings.columns = ["director", "avg_rating"]
 
-df_director = df[df["total_rating_users"] >= 30]
+    summary = pd.merge(director_counts, avg_ratings, on="director")
 
-director_counts = df_director["directors"].value_counts().reset_index()
-director_counts.columns = ["director", "movie_count"]
+    summary = summary[summary["movie_count"] > 1]
+    return summary.sort_values(by="movie_count", ascending=False).reset_index(drop=True)
 
-avg_ratings = df_director.groupby("directors")["avg_rating"].mean().reset_index()
-avg_ratings.columns = ["director", "avg_rating"]
 
-summary = pd.merge(director_counts, avg_ratings, on="director")
+async def main() -> None:
+    # person_images.py builds this and actor_summary.csv in one pass
+    args = build_parser("Build the director summary with images").parse_args()
 
-summary = summary[summary["movie_count"] > 1]
-summary = summary.sort_values(by="movie_count", ascending=False).reset_index(drop=True)
+    df = pd.read_csv(f"{args.data_dir}/clean_data.csv")
 
-print(summary)
+    print(df.isnull().sum())
 
+    summary = build_director_summary(df)
 
-def fetch_director_image(name: str) -> str | None:
-    """Fetch director profile image from TMDB API."""
-    try:
-        url = f"https://api.themoviedb.org/3/search/person?api_key={TMDB_API_KEY}&query={name}"
-
-        resp = requests.get(url, timeout=10)  # longer timeout
-        resp.raise_for_status()
-        data = resp.json()
+    print(summary)
 
-        if data["results"]:
-            profile_path = data["results"][0].get("profile_path")
-            if profile_path:
-                return f"{TMDB_IMAGE_BASE}{profile_path}"
-        return None
-    except Exception as e:
-        print(f"⚠️ Error fetching {name}: {e}")
-        return None
+    client = TMDBClient(
+        base_url=args.api_url,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        cache_path=args.response_cache,
+    )
+    try:
+        images = await fetch_person_images(summary["director"], client, args.cache)
+    finally:
+        client.close()
+    summary["image_url"] = summary["director"].map(images)
 
+    summary.to_csv(f"{args.data_dir}/director_summary.csv", index=False)
 
-summary["image_url"] = summary["director"].apply(fetch_director_image)
+    print("director_summary.csv saved successfully with image URLs!")
 
-summary.to_csv("./data/director_summary.csv", index=False)
 
-print("director_summary.csv saved successfully with image URLs!")
+if __name__ == "__main__":
+    asyncio.run(main())
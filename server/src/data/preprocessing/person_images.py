@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import os
+import pandas as pd
+from typing import Any, Iterable
+
+from tmdb_client import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE,
+    TMDB_API_URL,
+    TMDB_IMAGE_BASE,
+    TMDBClient,
+)
+
+PERSON_CACHE_PATH = "./data/person_images.csv"
+PERSON_CACHE_COLUMNS = ["name", "image_url"]
+
+
+def parse_profile_image(data: dict[str, Any]) -> str | None:
+    """Profile image URL of the best person search match, if it has one."""
+    if data.get("results"):
+        profile_path = data["results"][0].get("profile_path")
+        if profile_path:
+            return f"{TMDB_IMAGE_BASE}{profile_path}"
+    return None
+
+
+def load_person_cache(path: str) -> dict[str, str | None]:
+    if not os.path.exists(path):
+        return {}
+    cache = pd.read_csv(path, keep_default_na=False)
+    return {
+        name: image_url or None
+        for name, image_url in zip(cache["name"], cache["image_url"])
+    }
+
+
+async def fetch_person_images(
+    names: Iterable[str],
+    client: TMDBClient,
+    cache_path: str = PERSON_CACHE_PATH,
+    batch_size: int = 200,
+) -> dict[str, str | None]:
+    """
+    Profile image URL (or None) for every name, looking up each person once.
+
+    Names are deduplicated and those already in the name cache CSV are not
+    fetched again. Each finished batch is appended to the cache; lookups that
+    failed are left out so they are retried on the next run.
+    """
+    images = load_person_cache(cache_path)
+    todo = [
+        name
+        for name in dict.fromkeys(names)
+        if isinstance(name, str) and name and name not in images
+    ]
+    print(f"{len(images)} people cached, {len(todo)} to look up.")
+
+    for start in range(0, len(todo), batch_size):
+        batch = todo[start : start + batch_size]
+        results = await asyncio.gather(
+            *(client.fetch("/search/person", query=name) for name in batch)
+        )
+
+        rows = []
+        for name, (status, data) in zip(batch, results):
+            if status is None:
+                continue
+            images[name] = parse_profile_image(data) if status == 200 else None
+            rows.append({"name": name, "image_url": images[name] or ""})
+
+        pd.DataFrame(rows, columns=PERSON_CACHE_COLUMNS).to_csv(
+            cache_path,
+            mode="a",
+            header=not os.path.exists(cache_path),
+            index=False,
+        )
+        print(f"Looked up {start + len(batch)}/{len(todo)} people...")
+
+    return images
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Imported here: both scripts import this module for their own main
+    from filter_actor import build_actor_summary
+    from filter_director import build_director_summary
+
+    df = pd.read_csv(f"{args.data_dir}/clean_data.csv")
+    print(df.isnull().sum())
+
+    actor_summary = build_actor_summary(df)
+    director_summary = build_director_summary(df)
+    print(actor_summary)
+    print(director_summary)
+
+    # One pass over everyone: people who both act and direct are fetched once
+    client = TMDBClient(
+        base_url=args.api_url,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        cache_path=args.response_cache,
+    )
+    try:
+        images = await fetch_person_images(
+            [*actor_summary["actor"], *director_summary["director"]],
+            client,
+            args.cache,
+        )
+    finally:
+        client.close()
+    print(f"Finished fetching person images: {client.stats}")
+
+    actor_summary["image_url"] = actor_summary["actor"].map(images)
+    director_summary["image_url"] = director_summary["director"].map(images)
+
+    actor_summary.to_csv(f"{args.data_dir}/actor_summary.csv", index=False)
+    print("actor_summary.csv saved successfully with image URLs!")
+    director_summary.to_csv(f"{args.data_dir}/director_summary.csv", index=False)
+    print("director_summary.csv saved successfully with image URLs!")
+
+
+def build_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--data-dir", default="./data")
+    parser.add_argument("--cache", default=PERSON_CACHE_PATH)
+    parser.add_argument("--response-cache", default=None)
+    parser.add_argument("--api-url", default=TMDB_API_URL)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser("Build actor and director summaries with images").parse_args()
+    asyncio.run(main(args))
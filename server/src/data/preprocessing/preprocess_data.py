@@ -1,59 +1,298 @@
-import re
+import argparse
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import time
 import pandas as pd
+from typing import Any, Callable, NamedTuple
 
+import filter_actor
+import filter_director
+import person_images
+from filter_actor import build_actor_summary
+from filter_director import build_director_summary
+from person_images import fetch_person_images, load_person_cache
+from tmdb_client import DEFAULT_CONCURRENCY, DEFAULT_RATE, TMDBClient
 
-movies_df = pd.read_csv("./data/movies.csv")
-enriched_df = pd.read_csv("./data/enriched_movies.csv")
+try:
+    import pyarrow  # noqa: F401
 
+    FRAME_SUFFIX = ".parquet"
+except ImportError:
+    # pyarrow is not a project dependency; pickles keep the dtypes just as well
+    FRAME_SUFFIX = ".pkl"
 
-def get_decade(title: str) -> str:
+# Bump to rerun every stage after a change the hashed code does not show,
+# such as a pandas upgrade that alters the output
+PIPELINE_VERSION = 1
+
+ENRICHED_DTYPES = {
+    "movieId": "int64",
+    "original_title": "string",
+    "genres": "string",
+    "actors": "string",
+    "directors": "string",
+    "overview": "string",
+    "original_language": "string",
+    "poster_path": "string",
+    "avg_rating": "float64",
+    "total_rating_users": "float64",
+    "popularity_score": "float64",
+    "imdbId": "Int64",
+    "tmdbId": "Int64",
+}
+
+
+def read_frame(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def write_frame(df: pd.DataFrame, path: str) -> None:
+    tmp_path = f"{path}.tmp"
+    if path.endswith(".parquet"):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_csv(df: pd.DataFrame, path: str) -> None:
+    tmp_path = f"{path}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def get_decade(years: pd.Series) -> pd.Series:
     """
-    Extract release year from title (e.g., 'Movie (1995)') and compute decade shorthand.
+    Decade shorthand for a series of release years.
     - 1990-1999: '90s'
     - 1980-1989: '80s'
     - 2000-2009: '2000s'
     - 2010-2019: '2010s'
     - etc.
-    Returns 'N/A' if no valid year found.
+    'N/A' where the year is missing.
     """
-    year_match = re.search(r"\((\d{4})\)", title)
-    if year_match:
-        year = int(year_match.group(1))
-        decade = (year // 10) * 10
-        if decade >= 2000:
-            return f"{decade}s"
-        else:
-            return f"{str(decade % 100)}s"  # 1990 -> '90s', 1980 -> '80s'
-    return "N/A"
+    decade = (years // 10) * 10
+    shorthand = (decade % 100).where(decade < 2000, decade)  # 1990 -> 90
+    return (shorthand.astype("string") + "s").fillna("N/A")
+
+
+class Context(NamedTuple):
+    data_dir: str
+    work_dir: str
+    args: argparse.Namespace
+
+    def data(self, name: str) -> str:
+        return os.path.join(self.data_dir, name)
+
+    def frame(self, name: str) -> str:
+        return os.path.join(self.work_dir, f"{name}{FRAME_SUFFIX}")
+
+
+def load_stage(ctx: Context) -> None:
+    """Typed enriched movies, with the MovieLens title the year is parsed from."""
+    enriched_df = pd.read_csv(ctx.data("enriched_movies.csv"), dtype=ENRICHED_DTYPES)
+    movies_df = pd.read_csv(
+        ctx.data("movies.csv"),
+        usecols=["movieId", "title"],
+        dtype={"movieId": "int64", "title": "string"},
+    )
+    write_frame(
+        enriched_df.merge(movies_df, on="movieId", how="left"), ctx.frame("movies")
+    )
+
+
+def year_stage(ctx: Context) -> None:
+    """Release year and decade from titles like 'Movie (1995)'."""
+    movies_df = read_frame(ctx.frame("movies"))
+
+    years = movies_df["title"].str.extract(r"\((\d{4})\)", expand=False)
+    year_df = pd.DataFrame(
+        {"movieId": movies_df["movieId"], "year": years.astype("Int64")}
+    )
+    year_df["decade"] = get_decade(year_df["year"])
+    write_frame(year_df, ctx.frame("movie_year"))
+
+    # The seeder reads movie years from CSV
+    found = year_df.dropna(subset=["year"])
+    write_csv(found[["movieId", "year"]], ctx.data("movie_year.csv"))
+    if len(found) < len(year_df):
+        print(f"No year found in {len(year_df) - len(found)} titles.")
+
 
+def clean_stage(ctx: Context) -> None:
+    df = read_frame(ctx.frame("movies")).merge(
+        read_frame(ctx.frame("movie_year"))[["movieId", "decade"]],
+        on="movieId",
+        how="left",
+    )
+    df = df.drop(columns=["title", "imdbId"]).dropna()
 
-enriched_df["decade"] = movies_df["title"].apply(get_decade)
+    df["genres"] = (
+        df["genres"].str.replace(r"\|?IMAX\|?", "", regex=True).str.strip("|")
+    )  # Remove IMAX and extra pipes
+    df["genres"] = df["genres"].replace(
+        "", "(no genres listed)"
+    )  # Handle any now-empty genres
+    df["avg_rating"] = df["avg_rating"].round(2)
+    df["total_rating_users"] = df["total_rating_users"].astype("int64")
+    df["tmdbId"] = df["tmdbId"].astype("int64")
+    df = df[df.genres != "(no genres listed)"].reset_index(drop=True)
 
-enriched_df.dropna(inplace=True)
-enriched_df.drop(columns=["imdbId"], inplace=True)
-print(enriched_df.isnull().sum())
+    print(df.isnull().sum())
+
+    write_frame(df, ctx.frame("clean_data"))
+    write_csv(df, ctx.data("clean_data.csv"))
+
+
+def people_stage(ctx: Context) -> None:
+    """Actor and director summaries, with images for everyone in one lookup."""
+    df = read_frame(ctx.frame("clean_data"))
+    actor_summary = build_actor_summary(df)
+    director_summary = build_director_summary(df)
+
+    cache_path = ctx.data("person_images.csv")
+    names = [*actor_summary["actor"], *director_summary["director"]]
+    if ctx.args.offline:
+        images = load_person_cache(cache_path)
+    else:
+        client = TMDBClient(rate=ctx.args.rate, concurrency=ctx.args.concurrency)
+        try:
+            images = asyncio.run(fetch_person_images(names, client, cache_path))
+        finally:
+            client.close()
+
+    actor_summary["image_url"] = actor_summary["actor"].map(images)
+    director_summary["image_url"] = director_summary["director"].map(images)
+
+    write_csv(actor_summary, ctx.data("actor_summary.csv"))
+    write_csv(director_summary, ctx.data("director_summary.csv"))
+
+
+def model_data_stage(ctx: Context) -> None:
+    """Text fields the similarity model is trained on."""
+    df = read_frame(ctx.frame("clean_data"))
+    model_df = df.rename(columns={"movieId": "movie_id", "original_title": "title"})[
+        ["movie_id", "title", "genres", "directors", "actors", "overview"]
+    ]
+    write_csv(model_df, ctx.data("Model_data.csv"))
+
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable[[Context], None]
+    inputs: Callable[[Context], list[str]]
+    outputs: Callable[[Context], list[str]]
+    # Functions, modules and constants besides `run` that shape the outputs
+    code: tuple[Any, ...] = ()
+
+
+STAGES = [
+    Stage(
+        "load",
+        load_stage,
+        lambda ctx: [ctx.data("enriched_movies.csv"), ctx.data("movies.csv")],
+        lambda ctx: [ctx.frame("movies")],
+        code=(ENRICHED_DTYPES,),
+    ),
+    Stage(
+        "year",
+        year_stage,
+        lambda ctx: [ctx.frame("movies")],
+        lambda ctx: [ctx.frame("movie_year"), ctx.data("movie_year.csv")],
+        code=(get_decade,),
+    ),
+    Stage(
+        "clean",
+        clean_stage,
+        lambda ctx: [ctx.frame("movies"), ctx.frame("movie_year")],
+        lambda ctx: [ctx.frame("clean_data"), ctx.data("clean_data.csv")],
+    ),
+    Stage(
+        "people",
+        people_stage,
+        # New cached images change the summaries too
+        lambda ctx: [ctx.frame("clean_data"), ctx.data("person_images.csv")],
+        lambda ctx: [ctx.data("actor_summary.csv"), ctx.data("director_summary.csv")],
+        code=(filter_actor, filter_director, person_images),
+    ),
+    Stage(
+        "model_data",
+        model_data_stage,
+        lambda ctx: [ctx.frame("clean_data")],
+        lambda ctx: [ctx.data("Model_data.csv")],
+    ),
+]
+
+
+# What every stage reads and writes its files through
+SHARED_CODE = (Context, read_frame, write_frame, write_csv, FRAME_SUFFIX)
+
+
+def _source(obj: Any) -> str:
+    if inspect.ismodule(obj) or inspect.isclass(obj) or inspect.isroutine(obj):
+        return inspect.getsource(obj)
+    return repr(obj)
+
+
+def fingerprint(stage: Stage, ctx: Context) -> str:
+    """
+    Changes whenever an input file, the stage's code (its run function, the
+    helpers and modules it declares, the shared I/O helpers) or
+    PIPELINE_VERSION changes.
+    """
+    parts = [str(PIPELINE_VERSION)]
+    parts += [_source(obj) for obj in (stage.run, *stage.code, *SHARED_CODE)]
+    for path in stage.inputs(ctx):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+        else:
+            parts.append(f"{path}:missing")
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()
 
-enriched_df.to_csv("./data/clean_data.csv", index=False)
 
-df = pd.read_csv("./data/clean_data.csv")
+def run_pipeline(ctx: Context, force: bool = False) -> None:
+    os.makedirs(ctx.work_dir, exist_ok=True)
+    state_path = os.path.join(ctx.work_dir, "state.json")
+    state: dict[str, str] = {}
+    if os.path.exists(state_path):
+        with open(state_path) as f:
+            state = json.load(f)
 
+    for stage in STAGES:
+        up_to_date = state.get(stage.name) == fingerprint(stage, ctx) and all(
+            os.path.exists(path) for path in stage.outputs(ctx)
+        )
+        if up_to_date and not force:
+            print(f"⏭️  {stage.name}: inputs and code unchanged, skipped")
+            continue
 
-df["genres"] = (
-    df["genres"].str.replace(r"\|?IMAX\|?", "", regex=True).str.strip("|")
-)  # Remove IMAX and extra pipes
-df["genres"] = df["genres"].replace(
-    "", "(no genres listed)"
-)  # Handle any now-empty genres
-df["avg_rating"] = round(df["avg_rating"], 2)
-df["total_rating_users"] = df["total_rating_users"].astype(int)
-df["tmdbId"] = df["tmdbId"].astype(int)
-df = df[df.genres != "(no genres listed)"]
+        started = time.perf_counter()
+        stage.run(ctx)
+        print(f"✅ {stage.name}: {time.perf_counter() - started:.2f}s")
 
-print(df.isnull().sum())
-df.dropna(inplace=True)
+        # Taken after the run: the people stage appends to its own image cache
+        state[stage.name] = fingerprint(stage, ctx)
+        with open(f"{state_path}.tmp", "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(f"{state_path}.tmp", state_path)
 
-df.to_csv("./data/clean_data.csv", index=False)
 
-df = pd.read_csv("./data/clean_data.csv")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the preprocessing pipeline")
+    parser.add_argument("--data-dir", default="./data")
+    parser.add_argument("--force", action="store_true", help="Rerun every stage")
+    parser.add_argument(
+        "--offline", action="store_true", help="Only use cached person images"
+    )
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args()
 
-print(df.isnull().sum())
+    ctx = Context(args.data_dir, os.path.join(args.data_dir, ".pipeline"), args)
+    run_pipeline(ctx, force=args.force)
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+TMDB_API_URL = os.getenv("TMDB_API_URL", "https://api.themoviedb.org/3")
+TMDB_API_KEY = os.getenv("TMDB_API_KEY", "")
+TMDB_IMAGE_BASE = "https://image.tmdb.org/t/p/w500"
+
+# TMDB allows roughly 50 requests/second per IP; stay under it by default
+DEFAULT_RATE = 40.0
+DEFAULT_CONCURRENCY = 8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def retry_after_seconds(value: str | None, default: float) -> float:
+    """
+    Seconds to wait from a Retry-After header, which is either delay-seconds
+    or an HTTP-date; `default` when it is missing or unparseable.
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return max(0.0, (at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back for `seconds`, e.g. after a 429 Retry-After."""
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class ResponseCache:
+    """
+    On-disk cache of TMDB responses keyed by path and query (never the API key).
+
+    404s are cached too, so reruns skip ids TMDB does not know. Transient
+    failures are not cached and are retried on the next run.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response "
+            "(key TEXT PRIMARY KEY, status INTEGER NOT NULL, body TEXT)"
+        )
+
+    def get(self, key: str) -> tuple[int, Any] | None:
+        row = self._conn.execute(
+            "SELECT status, body FROM response WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        status, body = row
+        return status, json.loads(body) if body is not None else None
+
+    def put(self, key: str, status: int, body: Any) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO response (key, status, body) VALUES (?, ?, ?)",
+            (key, status, json.dumps(body) if body is not None else None),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class TMDBClient:
+    """
+    Concurrent TMDB client for the preprocessing scripts.
+
+    Requests share one pooled `requests.Session` and run on worker threads, at
+    most `concurrency` at a time, paced by a token bucket. 429 and 5xx
+    responses are retried with jittered exponential backoff (honouring
+    Retry-After). Point `base_url` at a local stub server to test without
+    hitting TMDB.
+    """
+
+    def __init__(
+        self,
+        api_key: str = TMDB_API_KEY,
+        base_url: str = TMDB_API_URL,
+        rate: float = DEFAULT_RATE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        cache_path: str | None = None,
+        max_retries: int = 5,
+        timeout: float = 10,
+    ) -> None:
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._bucket = TokenBucket(rate)
+        self._slots = asyncio.Semaphore(concurrency)
+        self.cache = ResponseCache(cache_path) if cache_path else None
+
+        self.stats = {"requests": 0, "cache_hits": 0, "retries": 0, "failures": 0}
+
+    async def get_json(self, path: str, **params: Any) -> Any | None:
+        """GET `path`; the JSON body, or None for 404s and exhausted retries."""
+        _, body = await self.fetch(path, **params)
+        return body
+
+    async def fetch(self, path: str, **params: Any) -> tuple[int | None, Any]:
+        """GET `path`; `(status, body)`, with status None when every attempt failed."""
+        key = f"{path}?{urlencode(sorted(params.items()))}"
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return cached
+
+        url = f"{self.base_url}{path}"
+        error = ""
+        for attempt in range(self.max_retries + 1):
+            await self._bucket.acquire()
+            async with self._slots:
+                self.stats["requests"] += 1
+                try:
+                    resp = await asyncio.to_thread(
+                        self._session.get,
+                        url,
+                        params={**params, "api_key": self.api_key},
+                        timeout=self.timeout,
+                    )
+                except requests.RequestException as e:
+                    resp, error = None, str(e)
+
+            if resp is not None:
+                if resp.status_code == 200:
+                    body = resp.json()
+                    if self.cache:
+                        self.cache.put(key, 200, body)
+                    return 200, body
+                if resp.status_code == 404:
+                    if self.cache:
+                        self.cache.put(key, 404, None)
+                    return 404, None
+                error = f"HTTP {resp.status_code}"
+                if resp.status_code not in RETRY_STATUSES:
+                    break
+
+            if attempt == self.max_retries:
+                break
+
+            self.stats["retries"] += 1
+            delay = min(30.0, 0.5 * 2**attempt) * random.uniform(0.5, 1.5)
+            if resp is not None and resp.status_code == 429:
+                delay = retry_after_seconds(resp.headers.get("Retry-After"), delay)
+                self._bucket.pause(delay)
+            await asyncio.sleep(delay)
+
+        self.stats["failures"] += 1
+        print(f"⚠️ Error fetching {path}: {error}")
+        return None, None
+
+    def close(self) -> None:
+        self._session.close()
+        if self.cache:
+            self.cache.close()
@@ -0,0 +1,28 @@
+import os
+
+# Settings without defaults; the tests build their own in-memory engines
+os.environ.setdefault("DB_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET", "test")
+os.environ.setdefault("JWT_REFRESH_SECRET", "test")
+os.environ.setdefault("ENV", "test")
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    """Print the per-query timings test_query_plans records, one column per size."""
+    timings: dict[str, dict[int, float]] = {}
+    for report in terminalreporter.stats.get("passed", []):
+        props = dict(report.user_properties)
+        if "query_ms" in props:
+            by_size = timings.setdefault(props["case"], {})
+            by_size[props["catalog_size"]] = props["query_ms"]
+    if not timings:
+        return
+
+    sizes = sorted({size for by_size in timings.values() for size in by_size})
+    terminalreporter.section("query timings (ms per call)")
+    terminalreporter.write_line(
+        f"{'case':>24}" + "".join(f"{size:>10}" for size in sizes)
+    )
+    for case, by_size in timings.items():
+        cells = (f"{by_size[s]:10.2f}" if s in by_size else f"{'-':>10}" for s in sizes)
+        terminalreporter.write_line(f"{case:>24}" + "".join(cells))
@@ -0,0 +1,251 @@
+"""
+Query-plan regression test for the hot SQL in MovieService.
+
+Seeds a synthetic catalog into an in-memory SQLite database, runs each hot
+query, captures the SQL it issues and checks the EXPLAIN QUERY PLAN of every
+SELECT:
+
+- no bare full-table scans (an ordered index scan that stops at LIMIT is fine)
+- no USE TEMP B-TREE FOR ORDER BY, except where a case explicitly allows it
+
+A schema change that reintroduces a full scan or a full-table sort fails here.
+
+Every case runs at each catalog size in SIZES and its mean time over
+TIMING_ROUNDS calls is recorded as the `query_ms` property, printed in a
+table at the end of the run (see conftest.py). The 50k catalog is marked
+`slow` and skipped by default; run it with `pytest -m slow`.
+"""
+
+import asyncio
+import random
+import re
+import time
+from typing import Any, Awaitable, Callable, Iterator, NamedTuple
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel
+
+from src.api.lib import movie_detail_cache, session_cache, trending_scores
+from src.api.models import (
+    Genre,
+    Movie,
+    MovieGenreLink,
+    RatingWatermark,
+    User,
+    UserRating,
+    Year,
+)
+from src.api.services import MovieService
+from src.core.database import create_engine
+from src.core.maintenance import prune_rating_deltas, prune_sessions
+from src.core.movie_card import refresh_movie_cards
+from src.core.rating_aggregates import create_rating_triggers
+from src.core.seed import create_fts_table
+
+SIZES = [1_000, 10_000, pytest.param(50_000, marks=pytest.mark.slow)]
+TIMING_ROUNDS = 20
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Children", "Comedy", "Crime",
+    "Documentary", "Drama", "Fantasy", "Film-Noir", "Horror", "Musical",
+    "Mystery", "Romance", "Sci-Fi", "Thriller", "War", "Western",
+]  # fmt: skip
+
+# Tables small enough that a full scan is expected and harmless
+SCAN_ALLOWED = {"genre", "rating_watermark"}
+
+BARE_SCAN = re.compile(r"^SCAN (\w+)$")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY")
+
+
+class Case:
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[MovieService, dict[str, Any]], Awaitable[Any]],
+        allow_sort: bool = False,
+    ) -> None:
+        self.name = name
+        self.run = run
+        # Sorting a bounded match set (FTS hits, a genre union) is unavoidable
+        self.allow_sort = allow_sort
+
+
+async def get_movie_cold(service: MovieService, ctx: dict[str, Any]) -> Any:
+    movie_detail_cache.clear()
+    return await service.get_movie(ctx["movie_id"], ctx["user_id"])
+
+
+async def get_movies_detail_cold(service: MovieService, ctx: dict[str, Any]) -> Any:
+    movie_detail_cache.clear()
+    return await service.get_movies_detail(ctx["bulk_ids"], ctx["user_id"])
+
+
+async def session_cache_sync(service: MovieService, ctx: dict[str, Any]) -> Any:
+    # An empty cache skips the poll
+    session_cache.add(ctx["user_id"], uuid4())
+    return await session_cache.sync(service.session)
+
+
+CASES = [
+    Case("search", lambda s, ctx: s.search("Movie 12", 20, 0), allow_sort=True),
+    Case("top_trending", lambda s, ctx: s.top_trending()),
+    Case("top_rating", lambda s, ctx: s.top_rating(None, 10, 0)),
+    Case(
+        "top_rating[genres]",
+        lambda s, ctx: s.top_rating("Action,Drama", 10, 0),
+        allow_sort=True,
+    ),
+    Case("get_genres", lambda s, ctx: s.get_genres()),
+    Case("get_movie[cold]", get_movie_cold),
+    Case("get_movie", lambda s, ctx: s.get_movie(ctx["movie_id"], ctx["user_id"])),
+    Case("get_movies", lambda s, ctx: s.get_movies(ctx["bulk_ids"])),
+    Case("get_movies_detail[cold]", get_movies_detail_cold),
+    Case(
+        "rate_movie",
+        lambda s, ctx: s.rate_movie(
+            ctx["movie_id"], ctx["user_id"], random.randint(1, 5)
+        ),
+    ),
+    Case("trending_sync", lambda s, ctx: trending_scores.sync(s.session)),
+    Case("prune_sessions", lambda s, ctx: prune_sessions(s.session, 100)),
+    Case("prune_rating_deltas", lambda s, ctx: prune_rating_deltas(s.session, 100)),
+    Case("session_cache_sync", session_cache_sync),
+]
+
+
+async def seed_catalog(session: AsyncSession, size: int) -> dict[str, Any]:
+    rng = random.Random(size)
+
+    years = [{"id": uuid4(), "year": y} for y in range(1950, 2025)]
+    genres = [{"id": uuid4(), "genre": g} for g in GENRES]
+    await session.execute(insert(Year), years)
+    await session.execute(insert(Genre), genres)
+
+    movies, links = [], []
+    for movie_id in range(1, size + 1):
+        total = rng.randint(0, 400)
+        avg = round(rng.uniform(0.5, 5.0), 2)
+        year = rng.choice(years)
+        movies.append(
+            {
+                "id": movie_id,
+                "original_title": f"Movie {movie_id}",
+                "overview": "Synthetic overview.",
+                "original_language": "en",
+                "poster_path": f"/{movie_id}.jpg",
+                "avg_rating": avg,
+                "total_rating_users": total,
+                "popularity_score": avg * total,
+                "tmdb_id": movie_id,
+                "year_id": year["id"],
+                "release_year": year["year"],
+            }
+        )
+        for genre in rng.sample(genres, rng.randint(1, 3)):
+            links.append({"movie_id": movie_id, "genre_id": genre["id"]})
+
+    await session.execute(insert(Movie), movies)
+    await session.execute(insert(MovieGenreLink), links)
+
+    user = User(name="plans")
+    session.add(user)
+    session.add(RatingWatermark(last_delta_id=1))
+    await session.flush()
+    await session.execute(
+        insert(UserRating), [{"user_id": user.id, "movie_id": 1, "rating": 4}]
+    )
+    await refresh_movie_cards(session)
+    await session.commit()
+    await create_fts_table(session)
+
+    return {
+        "movie_id": size // 2,
+        "user_id": user.id,
+        "bulk_ids": rng.sample(range(1, size + 1), 200),
+    }
+
+
+class Catalog(NamedTuple):
+    size: int
+    loop: asyncio.AbstractEventLoop
+    engine: AsyncEngine
+    async_session: async_sessionmaker[AsyncSession]
+    ctx: dict[str, Any]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size}")
+def catalog(request: pytest.FixtureRequest) -> Iterator[Catalog]:
+    """A seeded in-memory catalog, with the loop its engine is bound to."""
+    size: int = request.param
+    loop = asyncio.new_event_loop()
+    engine = create_engine(url="sqlite+aiosqlite:///:memory:")
+    async_session = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def seed() -> dict[str, Any]:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await create_rating_triggers(conn, split=False)
+        async with async_session() as session:
+            return await seed_catalog(session, size)
+
+    try:
+        ctx = loop.run_until_complete(seed())
+        yield Catalog(size, loop, engine, async_session, ctx)
+    finally:
+        loop.run_until_complete(engine.dispose())
+        loop.close()
+
+
+async def plan_problems(catalog: Catalog, case: Case) -> list[str]:
+    captured: list[tuple] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(catalog.engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with catalog.async_session() as session:
+            await case.run(MovieService(session), catalog.ctx)
+    finally:
+        event.remove(catalog.engine.sync_engine, "before_cursor_execute", capture)
+
+    problems = []
+    async with catalog.engine.connect() as conn:
+        for statement, parameters in captured:
+            if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                continue
+            rows = await conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+            for detail in (row[-1] for row in rows):
+                scan = BARE_SCAN.match(detail)
+                if scan and scan.group(1) not in SCAN_ALLOWED:
+                    problems.append(f"full scan ({detail})")
+                if TEMP_SORT.search(detail) and not case.allow_sort:
+                    problems.append(detail)
+    return problems
+
+
+async def mean_seconds(catalog: Catalog, case: Case) -> float:
+    started = time.perf_counter()
+    for _ in range(TIMING_ROUNDS):
+        async with catalog.async_session() as session:
+            await case.run(MovieService(session), catalog.ctx)
+    return (time.perf_counter() - started) / TIMING_ROUNDS
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: case.name)
+def test_query_plan(catalog: Catalog, case: Case, record_property) -> None:
+    problems = catalog.loop.run_until_complete(plan_problems(catalog, case))
+    assert not problems, f"{case.name}: " + "; ".join(sorted(set(problems)))
+
+    elapsed = catalog.loop.run_until_complete(mean_seconds(catalog, case))
+    record_property("case", case.name)
+    record_property("catalog_size", catalog.size)
+    record_property("query_ms", elapsed * 1000)
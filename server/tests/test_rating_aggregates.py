@@ -0,0 +1,170 @@
+"""
+Movie rating aggregates maintained by the user_rating triggers.
+
+Single file: rate_movie changes movie and movie_card in its own statement.
+Split catalog: the triggers queue deltas that apply_rating_deltas folds in
+exactly once. Both run against an in-memory database holding every table.
+"""
+
+import asyncio
+from datetime import timedelta
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel, col, select
+
+from src.api.models import (
+    Movie,
+    MovieCard,
+    RatingDelta,
+    RatingWatermark,
+    User,
+    UserRating,
+    Year,
+)
+from src.api.services import MovieService
+from src.api.utils import now_utc
+from src.config import Config
+from src.core.database import create_engine
+from src.core.maintenance import prune_rating_deltas
+from src.core.movie_card import refresh_movie_cards
+from src.core.rating_aggregates import apply_rating_deltas, create_rating_triggers
+
+
+async def setup(split: bool) -> tuple[async_sessionmaker[AsyncSession], list[UUID]]:
+    engine = create_engine(url="sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await create_rating_triggers(conn, split=split)
+
+    async_session = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with async_session() as session:
+        year_id = uuid4()
+        await session.execute(insert(Year), [{"id": year_id, "year": 2000}])
+        await session.execute(
+            insert(Movie),
+            [
+                {
+                    "id": 1,
+                    "original_title": "Movie 1",
+                    "overview": "Synthetic overview.",
+                    "original_language": "en",
+                    "poster_path": "/1.jpg",
+                    # Two seeded ratings averaging 4
+                    "avg_rating": 4.0,
+                    "total_rating_users": 2,
+                    "popularity_score": 0.0,
+                    "tmdb_id": 1,
+                    "year_id": year_id,
+                    "release_year": 2000,
+                }
+            ],
+        )
+        users = [User(name=f"rater {i}") for i in range(2)]
+        session.add_all(users)
+        session.add(RatingWatermark())
+        await refresh_movie_cards(session)
+        await session.commit()
+    return async_session, [u.id for u in users]
+
+
+async def aggregates(session: AsyncSession) -> tuple[tuple, tuple]:
+    movie = await session.execute(
+        select(Movie.avg_rating, Movie.total_rating_users).where(Movie.id == 1)
+    )
+    card = await session.execute(
+        select(MovieCard.avg_rating, MovieCard.total_rating_users).where(
+            MovieCard.movie_id == 1
+        )
+    )
+    return tuple(movie.one()), tuple(card.one())
+
+
+def test_rate_movie_updates_movie_and_card() -> None:
+    async def run() -> list[tuple]:
+        async_session, (alice, bob) = await setup(split=False)
+        seen = []
+        for user_id, rating in ((alice, 2), (bob, 3), (alice, 5), (alice, 5)):
+            async with async_session() as session:
+                await MovieService(session).rate_movie(1, user_id, rating)
+                movie, card = await aggregates(session)
+                assert card == movie
+                seen.append(movie)
+        return seen
+
+    seen = asyncio.run(run())
+    # (4 + 4 + 2) / 3, then + 3, then alice's 2 becomes 5, then an unchanged re-rate
+    assert [round(avg, 4) for avg, _ in seen] == [3.3333, 3.25, 4.0, 4.0]
+    assert [total for _, total in seen] == [3, 4, 4, 4]
+
+
+def test_rate_movie_unknown_movie() -> None:
+    async def run() -> int:
+        async_session, (alice, _) = await setup(split=False)
+        async with async_session() as session:
+            with pytest.raises(HTTPException) as error:
+                await MovieService(session).rate_movie(999, alice, 4)
+            assert error.value.status_code == 404
+            return len((await session.execute(select(UserRating))).all())
+
+    assert asyncio.run(run()) == 0
+
+
+def test_split_deltas_applied_once() -> None:
+    async def run() -> tuple[list[int], list[int], tuple, int]:
+        async_session, (alice, bob) = await setup(split=True)
+        async with async_session() as session:
+            await session.execute(
+                insert(UserRating),
+                [
+                    {"user_id": alice, "movie_id": 1, "rating": 2, "is_pseudo": False},
+                    {"user_id": bob, "movie_id": 1, "rating": 5, "is_pseudo": True},
+                ],
+            )
+            await session.execute(
+                update(UserRating).where(UserRating.user_id == alice).values(rating=5)
+            )
+            await session.commit()
+
+            first = await apply_rating_deltas(session)
+            # Nothing queued since: a second run must not apply anything again
+            second = await apply_rating_deltas(session)
+            movie, card = await aggregates(session)
+            assert card == movie
+            watermark = await session.scalar(select(RatingWatermark.last_delta_id))
+            return first, second, movie, watermark
+
+    first, second, movie, watermark = asyncio.run(run())
+    assert first == [1]
+    assert second == []
+    # Only the real rating counts: (4 + 4 + 5) / 3 over 3 users
+    assert (round(movie[0], 4), movie[1]) == (4.3333, 3)
+    assert watermark == 2
+
+
+def test_prune_keeps_unapplied_and_recent_deltas() -> None:
+    async def run() -> list[int]:
+        async_session, (alice, bob) = await setup(split=True)
+        async with async_session() as session:
+            # Queues deltas 1 and 2 (alice) and 3 (bob)
+            for user_id, rating in ((alice, 3), (alice, 4), (bob, 4)):
+                await MovieService(session).rate_movie(1, user_id, rating)
+            # 1 and 2 applied, 1 and 3 past the retention window
+            await session.execute(update(RatingWatermark).values(last_delta_id=2))
+            old = now_utc() - timedelta(hours=Config.RATING_DELTA_RETENTION_HOURS + 1)
+            await session.execute(
+                update(RatingDelta)
+                .where(col(RatingDelta.id).in_([1, 3]))
+                .values(created_at=old)
+            )
+            await session.commit()
+
+            assert await prune_rating_deltas(session, 100) == 1
+            return list((await session.execute(select(RatingDelta.id))).scalars())
+
+    assert asyncio.run(run()) == [2, 3]
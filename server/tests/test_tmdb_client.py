@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "src", "data", "preprocessing")
+)
+
+from tmdb_client import TMDBClient, retry_after_seconds  # noqa: E402
+
+
+def http_date(seconds_from_now: float) -> str:
+    at = datetime.now(timezone.utc) + timedelta(seconds=seconds_from_now)
+    return format_datetime(at, usegmt=True)
+
+
+@pytest.fixture
+def stub_tmdb() -> Iterator[tuple[str, list[str | None]]]:
+    """
+    Local TMDB stub that answers each request with 429 and the next queued
+    Retry-After value, then 200 once the queue is empty.
+    """
+    retry_afters: list[str | None] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if retry_afters:
+                value = retry_afters.pop(0)
+                self.send_response(429)
+                if value is not None:
+                    self.send_header("Retry-After", value)
+                self.end_headers()
+                return
+            body = json.dumps({"id": 862}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}", retry_afters
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("3", 3.0),
+        ("0.5", 0.5),
+        (None, 7.0),
+        ("soon", 7.0),
+        (http_date(-60), 0.0),
+    ],
+)
+def test_retry_after_seconds(value: str | None, expected: float) -> None:
+    assert retry_after_seconds(value, 7.0) == expected
+
+
+def test_retry_after_http_date_in_future() -> None:
+    assert 8 <= retry_after_seconds(http_date(10), 0.0) <= 10
+
+
+@pytest.mark.parametrize(
+    "retry_after",
+    [["0"], [http_date(-1)], [http_date(1)], ["not a date"], ["0", http_date(0)]],
+    ids=["seconds", "past-date", "future-date", "invalid", "both"],
+)
+def test_fetch_backs_off_on_429(stub_tmdb, retry_after: list[str]) -> None:
+    base_url, queue = stub_tmdb
+    queue.extend(retry_after)
+
+    client = TMDBClient(api_key="test", base_url=base_url, rate=1000, max_retries=3)
+    try:
+        status, body = asyncio.run(client.fetch("/movie/862"))
+    finally:
+        client.close()
+
+    assert (status, body) == (200, {"id": 862})
+    assert client.stats["retries"] == len(retry_after)
+    assert client.stats["failures"] == 0